@@ -2,27 +2,62 @@
 -- AUSTRALIAN RETAIL SALES DATABASE SCHEMA
 -- =============================================
 
+-- Dimension tables: category and state names
+-- Filled by src/utils/create_mappings.py. The smallint ids are the keys
+-- sales_facts stores instead of the codes
+CREATE TABLE state_mapping (
+    state_code VARCHAR(10) PRIMARY KEY,
+    state_name VARCHAR(100) NOT NULL,
+    state_full_name VARCHAR(200) NOT NULL,
+    state_id SMALLINT GENERATED BY DEFAULT AS IDENTITY
+);
+
+CREATE UNIQUE INDEX idx_state_id ON state_mapping(state_id);
+
+CREATE TABLE category_mapping (
+    category_code VARCHAR(10) PRIMARY KEY,
+    category_name VARCHAR(200) NOT NULL,
+    category_description VARCHAR(500),
+    category_id SMALLINT GENERATED BY DEFAULT AS IDENTITY
+);
+
+CREATE UNIQUE INDEX idx_category_id ON category_mapping(category_id);
+
 -- Table 1: Retail Sales Facts
--- Stores actual sales data from ABS
-CREATE TABLE retail_sales (
-    sale_id SERIAL PRIMARY KEY,
+-- Stores actual sales data from ABS, one row per category, state and month.
+-- Compact layout: smallint dimension keys and only the measured values
+-- (about half the size of the old retail_sales table). The primary key is
+-- the API's series access path (category + state filters in date order).
+-- Partitioned by year (sales_facts_y1982, ...): date windows read only the
+-- years they cover, and a year is reloaded by swapping its partition.
+-- The loaders create partitions as data arrives. Rows are inserted in
+-- date order, so a BRIN index serves sale_date ranges
+CREATE TABLE sales_facts (
+    category_id SMALLINT NOT NULL,
+    state_id SMALLINT NOT NULL,
     sale_date DATE NOT NULL,
-    category VARCHAR(200),
-    state VARCHAR(50),
-    turnover_millions DECIMAL(15, 2),
-    month_name VARCHAR(20),
-    year INTEGER,
-    growth_rate_yoy DECIMAL(5, 2),
-    data_source VARCHAR(100) DEFAULT 'ABS_MHSI',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    turnover_millions NUMERIC(20, 4),
+    growth_rate_yoy NUMERIC(10, 2),
+    PRIMARY KEY (category_id, state_id, sale_date)
+) PARTITION BY RANGE (sale_date);
+
+CREATE INDEX idx_facts_sale_date ON sales_facts USING brin (sale_date) WITH (pages_per_range = 16);
+CREATE INDEX idx_facts_state ON sales_facts(state_id, sale_date);
 
--- Create indexes for faster queries
-CREATE INDEX idx_sale_date ON retail_sales(sale_date);
-CREATE INDEX idx_category ON retail_sales(category);
-CREATE INDEX idx_state ON retail_sales(state);
-CREATE INDEX idx_year_month ON retail_sales(year, month_name);
+-- retail_sales: the facts with codes, month name and year, as read by the
+-- API, forecasting and reports (write to sales_facts)
+CREATE VIEW retail_sales AS
+SELECT 
+    f.sale_date,
+    c.category_code as category,
+    s.state_code as state,
+    f.turnover_millions,
+    TO_CHAR(f.sale_date, 'FMMonth') as month_name,
+    EXTRACT(YEAR FROM f.sale_date)::INTEGER as year,
+    f.growth_rate_yoy
+FROM sales_facts f
+JOIN category_mapping c ON c.category_id = f.category_id
+JOIN state_mapping s ON s.state_id = f.state_id;
 
 -- Table 2: Sales Forecasts
 -- Stores ML model predictions
@@ -41,7 +76,8 @@ CREATE TABLE sales_forecasts (
 );
 
 CREATE INDEX idx_forecast_date ON sales_forecasts(forecast_date);
-CREATE INDEX idx_forecast_category ON sales_forecasts(category);
+CREATE INDEX idx_forecast_series ON sales_forecasts(category, state, forecast_date)
+    INCLUDE (predicted_turnover, lower_bound, upper_bound);
 
 -- Table 3: ETL Job Logs
 -- Track data pipeline runs
@@ -72,4 +108,57 @@ CREATE TABLE data_quality (
     check_passed BOOLEAN,
     notes TEXT,
     checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+-- Table 5: Dataset Summary
+-- One precomputed row per dataset, served by /sales/summary and /forecasts/summary
+-- Refreshed by the loader and forecast publisher at the end of each run
+CREATE TABLE dataset_summary (
+    dataset VARCHAR(50) PRIMARY KEY,
+    total_records INTEGER NOT NULL,
+    categories INTEGER NOT NULL,
+    states INTEGER NOT NULL,
+    earliest_date DATE,
+    latest_date DATE,
+    avg_value DOUBLE PRECISION,
+    min_value DOUBLE PRECISION,
+    max_value DOUBLE PRECISION,
+    data_version INTEGER NOT NULL DEFAULT 1,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table 6: Retail Sales Change Log
+-- Rows inserted (I), updated (U) or deleted (D) in sales_facts, stamped with
+-- the data version that published them, served by /sales/changes.
+-- 'R' rows mark versions before which changes are unavailable.
+-- Filled by statement-level triggers, installed with the first 'R' row by
+-- src/utils/init_database.py (or src/utils/create_change_log.py when this file
+-- is applied by hand). /sales/changes answers 404 until they exist
+CREATE TABLE retail_sales_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    data_version INTEGER NOT NULL,
+    op CHAR(1) NOT NULL,
+    sale_date DATE,
+    category VARCHAR(200),
+    state VARCHAR(50),
+    turnover_millions NUMERIC(20, 4),
+    growth_rate_yoy NUMERIC(10, 2),
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_changes_version ON retail_sales_changes(data_version);
+
+-- Table 7: Series Rankings
+-- Growth rankings served by /insights/top-movers (metric: yoy, mom,
+-- forecast_growth, scope: category, state, series, rank 1 = fastest growing)
+-- Rebuilt in full with every dataset_summary refresh
+CREATE TABLE series_rankings (
+    metric VARCHAR(20) NOT NULL,
+    scope VARCHAR(20) NOT NULL,
+    period DATE NOT NULL,
+    rank INTEGER NOT NULL,
+    category VARCHAR(200) NOT NULL,
+    state VARCHAR(50) NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (metric, scope, period, rank)
+);
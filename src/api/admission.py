@@ -0,0 +1,215 @@
+from datetime import date
+from starlette.datastructures import QueryParams
+from starlette.responses import JSONResponse
+import asyncio
+import json
+import math
+import os
+import time
+
+from api.metrics import ADMISSION_QUEUED, ADMISSION_REJECTIONS, resolve_route
+
+# Rough size of the fact tables, used when a request has no limit
+FULL_SCAN_ROWS = 100000
+
+# Rows in one monthly category/state series (1982 onwards), and how many
+# series a single category or state filter selects at most
+ROWS_PER_SERIES = 600
+SERIES_PER_CATEGORY = 10
+SERIES_PER_STATE = 25
+
+# First month of the ABS series, for date ranges without a start
+FIRST_MONTH = date(1982, 4, 1)
+
+def series_selected(params):
+    """Most series the category/state filters can select"""
+    category = params.get('category')
+    state = params.get('state')
+    
+    if category and state:
+        return 1
+    if category:
+        return SERIES_PER_CATEGORY
+    if state:
+        return SERIES_PER_STATE
+    return SERIES_PER_CATEGORY * SERIES_PER_STATE
+
+def months_selected(params):
+    """Months covered by the start_date/end_date filters (all of them if unparseable)"""
+    try:
+        start = date.fromisoformat(params.get('start_date') or FIRST_MONTH.isoformat())
+        end = date.fromisoformat(params.get('end_date') or date.today().isoformat())
+    except ValueError:
+        start, end = FIRST_MONTH, date.today()
+    
+    start = max(start, FIRST_MONTH)
+    return max(0, (end.year - start.year) * 12 + end.month - start.month + 1)
+
+def estimate_cost(params):
+    """
+    Estimate the rows a request reads from its limit and filters
+    
+    Deliberately coarse: it only has to separate one-series lookups from
+    table-wide pulls and scans, without touching the database.
+    """
+    try:
+        rows = int(params.get('limit', FULL_SCAN_ROWS))
+    except ValueError:
+        rows = FULL_SCAN_ROWS
+    
+    if series_selected(params) < SERIES_PER_CATEGORY * SERIES_PER_STATE:
+        rows = min(rows, ROWS_PER_SERIES * series_selected(params))
+    
+    return rows
+
+def estimate_aggregate_cost(params):
+    """Rows /sales/aggregate groups: months in the date range for every selected series"""
+    return months_selected(params) * series_selected(params)
+
+def estimate_batch_cost(body):
+    """Rows /series/batch reads: one series per distinct (category, state) selector"""
+    try:
+        selectors = json.loads(body)['series']
+        pairs = {(s.get('category'), s.get('state')) for s in selectors}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return 0  # rejected with 422 by the endpoint
+    
+    return len(pairs) * ROWS_PER_SERIES
+
+async def read_body(receive):
+    """The complete request body, from its http.request messages"""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if message['type'] != 'http.request' or not message.get('more_body', False):
+            return b''.join(chunks)
+
+def replay_body(body, receive):
+    """receive callable that hands the already-read body to the app first"""
+    sent = False
+    
+    async def replay():
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    
+    return replay
+
+class RouteLimiter:
+    """Concurrency limit for one route, with a bounded wait queue"""
+    
+    def __init__(self, route, concurrency, queue_size, timeout):
+        self.route = route
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.waiting = 0
+        self.service_time = 1.0  # moving average of seconds per admitted request
+        self._semaphore = asyncio.Semaphore(concurrency)
+    
+    def retry_after(self):
+        """Seconds until a slot is likely free, for the Retry-After header"""
+        return max(1, math.ceil(self.service_time * (self.waiting + 1) / self.concurrency))
+    
+    async def acquire(self):
+        """Take a slot; returns 'full' or 'timeout' instead if the request can't be admitted"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return None
+        
+        if self.waiting >= self.queue_size:
+            return 'full'
+        
+        self.waiting += 1
+        ADMISSION_QUEUED.labels(self.route).inc()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            return None
+        except asyncio.TimeoutError:
+            return 'timeout'
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUED.labels(self.route).dec()
+    
+    def release(self, elapsed):
+        self.service_time = 0.8 * self.service_time + 0.2 * elapsed
+        self._semaphore.release()
+
+class AdmissionMiddleware:
+    """
+    Per-route admission control for expensive requests
+    
+    Requests to `routes` whose estimated cost exceeds `heavy_rows` (rows read:
+    from the selectors in the body for /series/batch, from the date range and
+    filters for /sales/aggregate) take one of the route's `concurrency` slots, waiting in a queue of at most
+    `queue_size` for up to `timeout` seconds. A full queue is answered with
+    429 and a timed-out wait with 503, both with Retry-After. Cheap requests
+    (health checks, metadata, single-series lookups) are never queued.
+    """
+    
+    def __init__(self, app, routes=(), concurrency=None, queue_size=None, timeout=None, heavy_rows=None):
+        self.app = app
+        self.concurrency = concurrency or int(os.getenv('ADMISSION_CONCURRENCY', '2'))
+        self.queue_size = queue_size if queue_size is not None else int(os.getenv('ADMISSION_QUEUE_SIZE', '8'))
+        self.timeout = timeout or float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '15'))
+        self.heavy_rows = heavy_rows or int(os.getenv('ADMISSION_HEAVY_ROWS', '20000'))
+        self.routes = set(routes)
+        self._limiters = {}
+    
+    def limiter(self, route):
+        # Created lazily so the semaphore belongs to the serving event loop
+        if route not in self._limiters:
+            self._limiters[route] = RouteLimiter(route, self.concurrency, self.queue_size, self.timeout)
+        return self._limiters[route]
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        route = resolve_route(scope)
+        if route not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        
+        params = QueryParams(scope['query_string'])
+        if route == '/series/batch':
+            # The selectors are in the body: read it, then replay it to the app
+            body = await read_body(receive)
+            receive = replay_body(body, receive)
+            cost = estimate_batch_cost(body)
+        elif route == '/sales/aggregate':
+            cost = estimate_aggregate_cost(params)
+        else:
+            cost = estimate_cost(params)
+        
+        if cost < self.heavy_rows:
+            await self.app(scope, receive, send)
+            return
+        
+        limiter = self.limiter(route)
+        rejected = await limiter.acquire()
+        
+        if rejected:
+            ADMISSION_REJECTIONS.labels(route, rejected).inc()
+            status, detail = (
+                (429, "Too many expensive requests queued; retry later")
+                if rejected == 'full' else
+                (503, "Timed out waiting for capacity; retry later")
+            )
+            response = JSONResponse(
+                {"detail": detail},
+                status_code=status,
+                headers={'Retry-After': str(limiter.retry_after())}
+            )
+            await response(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
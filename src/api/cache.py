@@ -0,0 +1,133 @@
+from starlette.concurrency import run_in_threadpool
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+import os
+
+class CacheEntry:
+    """A serialised response body plus its compressed variants"""
+    
+    __slots__ = ('body', 'content_type', 'encoded')
+    
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        self.encoded = {}
+    
+    @property
+    def size(self):
+        return len(self.body) + sum(len(b) for b in self.encoded.values())
+
+class ResponseCache:
+    """
+    In-process LRU of serialised JSON responses for the current data version
+    
+    Keys carry the data version, so a new load or forecast run simply stops
+    matching old entries; the first write under a new version clears them.
+    Compressed variants are stored on the entry, so each response is
+    compressed at most once per encoding per data version.
+    
+    With a `shared` tier (see api/shared_cache.py), bodies are also written
+    there, and a local miss is looked up in it before the request runs, so
+    worker processes only query the database once per response per version.
+    """
+    
+    def __init__(self, max_bytes=None, shared=None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.getenv('RESPONSE_CACHE_MB', '64')) * 1024 * 1024
+        )
+        self.shared = shared
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+    
+    @staticmethod
+    def make_key(version, path, query_string):
+        """Cache key with query parameters normalised (order-insensitive)"""
+        if isinstance(query_string, bytes):
+            query_string = query_string.decode('latin-1')
+        params = sorted(parse_qsl(query_string, keep_blank_values=True))
+        return (version, path, urlencode(params))
+    
+    def get(self, key):
+        entry = self._entries.get(key)
+        
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+    
+    def put(self, key, body, content_type):
+        """Store a body; returns the entry even if it was too large to keep"""
+        if key[0] != self.version:
+            self.clear()
+            self.version = key[0]
+        
+        entry = CacheEntry(body, content_type)
+        
+        # One response may not take more than a quarter of the cache
+        if entry.size <= self.max_bytes // 4:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+        
+        return entry
+    
+    async def get_shared(self, key):
+        """Look a key up in the shared tier, keeping a hit in this process too"""
+        if self.shared is None:
+            return None
+        
+        version, path, query = key
+        found = await run_in_threadpool(self.shared.get_response, f"{path}?{query}", version)
+        
+        if found is None:
+            return None
+        
+        body, content_type = found
+        return self.put(key, body, content_type)
+    
+    async def put_shared(self, key, entry):
+        """Write an entry's body to the shared tier (no-op without one)"""
+        if self.shared is None:
+            return
+        
+        version, path, query = key
+        await run_in_threadpool(
+            self.shared.put_response, f"{path}?{query}", version, entry.body, entry.content_type
+        )
+    
+    def add_variant(self, key, entry, encoding, body):
+        """Record a compressed variant of a cached entry"""
+        entry.encoded[encoding] = body
+        
+        if self._entries.get(key) is entry:
+            self._bytes += len(body)
+            self._evict()
+    
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+    
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+    
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
@@ -0,0 +1,220 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+import asyncio
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript')
+
+# Bodies larger than this are compressed off the event loop
+THREADPOOL_THRESHOLD = 64 * 1024
+
+def negotiate_encoding(accept_encoding):
+    """Pick 'br', 'gzip' or None from an Accept-Encoding header (honours q-values)"""
+    weights = {}
+    
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+    
+    candidates = []
+    if brotli is not None:
+        candidates.append('br')
+    candidates.append('gzip')
+    
+    best = None
+    for encoding in candidates:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    
+    return best[0] if best else None
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+async def compress_async(body, encoding):
+    if len(body) >= THREADPOOL_THRESHOLD:
+        return await run_in_threadpool(compress, body, encoding)
+    return compress(body, encoding)
+
+class CompressionMiddleware:
+    """
+    Compress responses (brotli or gzip, by Accept-Encoding) above a size threshold
+    
+    GET requests to `cacheable_paths` are also served from `cache`: a successful
+    JSON body is stored under the current data version and each compressed
+    variant is produced once, so hot responses are neither re-queried nor
+    re-compressed until the next data release. Identical cacheable requests
+    that arrive while one is already running wait for it and share its
+    body (X-Cache: COALESCED) instead of each querying the database
+    (RESPONSE_COALESCING=0 turns this off). If
+    the data version can't be read, requests are passed through uncached.
+    Streaming responses (e.g. server-sent events) pass through untouched.
+    """
+    
+    def __init__(self, app, cache=None, version_key=None, cacheable_paths=(), minimum_size=None, coalesce=None):
+        self.app = app
+        self.cache = cache
+        self.version_key = version_key
+        self.cacheable_paths = tuple(cacheable_paths)
+        self.minimum_size = minimum_size if minimum_size is not None else int(
+            os.getenv('COMPRESSION_MIN_BYTES', '1024')
+        )
+        self.coalesce = coalesce if coalesce is not None else os.getenv('RESPONSE_COALESCING', '1') == '1'
+        self._in_flight = {}
+    
+    def is_cacheable(self, scope):
+        if self.cache is None or scope['method'] != 'GET':
+            return False
+        
+        path = scope['path']
+        return any(path == p or path.startswith(p + '/') for p in self.cacheable_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        
+        cache_key = None
+        leader = None
+        
+        if self.is_cacheable(scope):
+            try:
+                version = await self.version_key()
+                cache_key = self.cache.make_key(version, scope['path'], scope['query_string'])
+            except Exception as e:
+                # No data version (e.g. dataset_summary unreadable): serve uncached
+                print(f"⚠️ Response cache skipped, data version unavailable: {e}")
+        
+        if cache_key is not None:
+            entry = self.cache.get(cache_key)
+            
+            if entry is not None:
+                await self.send_entry(send, cache_key, entry, encoding, 'HIT')
+                return
+            
+            entry = await self.cache.get_shared(cache_key)
+            if entry is not None:
+                await self.send_entry(send, cache_key, entry, encoding, 'SHARED')
+                return
+            
+            pending = self._in_flight.get(cache_key) if self.coalesce else None
+            if pending is not None:
+                # Identical request already running: wait and share its body.
+                # If it produced nothing cacheable (e.g. an error), run our own.
+                entry = await asyncio.shield(pending)
+                if entry is not None:
+                    await self.send_entry(send, cache_key, entry, encoding, 'COALESCED')
+                    return
+            elif self.coalesce:
+                leader = asyncio.get_running_loop().create_future()
+                self._in_flight[cache_key] = leader
+        
+        entry = None
+        try:
+            entry = await self.forward(scope, receive, send, encoding, cache_key)
+        finally:
+            if leader is not None:
+                del self._in_flight[cache_key]
+                leader.set_result(entry)
+    
+    async def forward(self, scope, receive, send, encoding, cache_key):
+        """Run the app, caching and/or compressing its response; returns the cache entry if stored"""
+        start_message = None
+        chunks = []
+        streaming = False
+        
+        async def capture(message):
+            nonlocal start_message, streaming
+            
+            if message['type'] == 'http.response.start':
+                start_message = message
+            elif message['type'] == 'http.response.body' and not streaming:
+                chunks.append(message.get('body', b''))
+                
+                if message.get('more_body', False):
+                    # Streaming response: send what we have and stop buffering
+                    streaming = True
+                    await send(start_message)
+                    await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': True})
+            else:
+                await send(message)
+        
+        await self.app(scope, receive, capture)
+        
+        if streaming or start_message is None:
+            return None
+        
+        body = b''.join(chunks)
+        headers = MutableHeaders(scope=start_message)
+        content_type = headers.get('content-type', '')
+        
+        if (
+            cache_key is not None
+            and start_message['status'] == 200
+            and content_type.startswith('application/json')
+            and 'content-encoding' not in headers
+        ):
+            entry = self.cache.put(cache_key, body, content_type)
+            await self.send_entry(send, cache_key, entry, encoding, 'MISS')
+            await self.cache.put_shared(cache_key, entry)
+            return entry
+        
+        if (
+            encoding
+            and len(body) >= self.minimum_size
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and 'content-encoding' not in headers
+        ):
+            body = await compress_async(body, encoding)
+            headers['content-encoding'] = encoding
+            headers['content-length'] = str(len(body))
+            headers.add_vary_header('Accept-Encoding')
+        
+        await send(start_message)
+        await send({'type': 'http.response.body', 'body': body})
+        return None
+    
+    async def send_entry(self, send, key, entry, encoding, cache_status):
+        """Send a cached entry, compressing (and remembering) the variant if needed"""
+        headers = [
+            (b'content-type', entry.content_type.encode('latin-1')),
+            (b'vary', b'Accept-Encoding'),
+            (b'x-cache', cache_status.encode('latin-1')),
+        ]
+        body = entry.body
+        
+        if encoding and len(body) >= self.minimum_size:
+            encoded = entry.encoded.get(encoding)
+            if encoded is None:
+                encoded = await compress_async(body, encoding)
+                self.cache.add_variant(key, entry, encoding, encoded)
+            body = encoded
+            headers.append((b'content-encoding', encoding.encode('latin-1')))
+        
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+        
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,60 @@
+from sqlalchemy.exc import ProgrammingError
+import asyncio
+import os
+import time
+
+from api.db import read_sql
+
+class DataVersionTracker:
+    """
+    Track the published data version of each dataset
+    
+    Versions come from dataset_summary.data_version, which the loader and
+    forecast publisher bump at the end of every run. The table is re-read at
+    most once every `ttl_seconds` so requests don't pay a round trip each.
+    """
+    
+    def __init__(self, engine, ttl_seconds=None):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv('DATA_VERSION_TTL_SECONDS', '30')
+        )
+        self._versions = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _is_fresh(self):
+        return (
+            self._versions is not None
+            and time.monotonic() - self._checked_at < self.ttl_seconds
+        )
+    
+    async def _read_versions(self):
+        """Read {dataset: data_version} (empty before the first refresh)"""
+        try:
+            df = await read_sql(self.engine, "SELECT dataset, data_version FROM dataset_summary")
+        except ProgrammingError:
+            return {}
+        
+        return {row.dataset: int(row.data_version) for row in df.itertuples()}
+    
+    async def current(self):
+        """Return the latest known {dataset: data_version} mapping"""
+        if self._is_fresh():
+            return self._versions
+        
+        async with self._lock:
+            if not self._is_fresh():
+                self._versions = await self._read_versions()
+                self._checked_at = time.monotonic()
+        
+        return self._versions
+    
+    async def key(self):
+        """Compact version string for cache keys, e.g. 'r12.f4'"""
+        versions = await self.current()
+        return f"r{versions.get('retail_sales', 0)}.f{versions.get('sales_forecasts', 0)}"
+    
+    def invalidate(self):
+        """Force the next call to re-read the versions"""
+        self._checked_at = 0.0
@@ -0,0 +1,104 @@
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from uuid import uuid4
+import pandas as pd
+import asyncio
+import os
+import time
+
+from api.metrics import add_stage_time, current_route
+from api.query_log import SLOW_QUERY_MS, log_slow_query
+
+# Server-side statement timeouts (seconds) per route; see set_route_timeouts
+_route_timeouts = {}
+
+def set_route_timeouts(timeouts):
+    """
+    Set statement timeouts for routes, e.g. {'/sales': 20}
+    
+    Queries issued while serving these routes run with SET LOCAL
+    statement_timeout, so Postgres cancels them; other queries are bounded
+    by DB_STATEMENT_TIMEOUT on the client side.
+    """
+    _route_timeouts.update(timeouts)
+
+def is_timeout(error):
+    """True for a statement timeout / cancelled query (server or client side)"""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return getattr(getattr(error, 'orig', None), 'sqlstate', None) == '57014'
+
+def get_async_engine():
+    """
+    Create the API's async engine (asyncpg) with an explicitly sized pool
+    
+    Pool settings come from the environment so they can be tuned per instance:
+    - DB_POOL_SIZE / DB_MAX_OVERFLOW: persistent and burst connections
+    - DB_POOL_TIMEOUT: seconds a request waits for a free connection
+    - DB_POOL_RECYCLE: seconds before a connection is replaced
+    - DB_STATEMENT_TIMEOUT: seconds before a running query is cancelled
+    """
+    connection_string = (
+        f"postgresql+asyncpg://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+        # Supabase's pooler (port 6543) runs in transaction mode and cannot
+        # keep prepared statements alive between transactions
+        "?prepared_statement_cache_size=0"
+    )
+    
+    return create_async_engine(
+        connection_string,
+        pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '5')),
+        pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        pool_pre_ping=True,
+        connect_args={
+            'statement_cache_size': 0,
+            'prepared_statement_name_func': lambda: f"__asyncpg_{uuid4()}__",
+            'command_timeout': float(os.getenv('DB_STATEMENT_TIMEOUT', '30')),
+        }
+    )
+
+async def read_sql(engine, query, params=None):
+    """
+    Async equivalent of pd.read_sql for a text query
+    
+    Applies the current route's statement timeout (answering 504 when it
+    is hit) and logs queries slower than SLOW_QUERY_MS.
+    """
+    route = current_route()
+    timeout = _route_timeouts.get(route)
+    started = time.perf_counter()
+    checked_out = None
+    
+    try:
+        async with engine.connect() as conn:
+            checked_out = time.perf_counter()
+            
+            if timeout:
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+            
+            result = await conn.execute(text(query), params or {})
+            columns = list(result.keys())
+            rows = result.fetchall()
+    except (DBAPIError, asyncio.TimeoutError) as e:
+        if not is_timeout(e) or checked_out is None:
+            raise
+        
+        log_slow_query(engine, route, query, params, time.perf_counter() - checked_out, error="statement timeout")
+        raise HTTPException(status_code=504, detail="Query exceeded its time limit; narrow the filters or lower the limit")
+    
+    elapsed = time.perf_counter() - checked_out
+    
+    # Pool wait and query time are reported separately in /metrics
+    add_stage_time('pool_wait', checked_out - started)
+    add_stage_time('db', elapsed)
+    
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        log_slow_query(engine, route, query, params, elapsed, rows=len(rows))
+    
+    # coerce_float turns NUMERIC (Decimal) values into floats like pd.read_sql does
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
@@ -0,0 +1,138 @@
+import asyncio
+
+from api.db import read_sql
+
+def distinct_values_query(column):
+    """
+    Distinct values of a retail_sales column, in order, via a loose index scan
+    
+    Steps from one value to the next through the index that leads with the
+    column (idx_sales_series for category, idx_state for state), touching
+    one index entry per value instead of scanning every row like DISTINCT.
+    """
+    return f"""
+        WITH RECURSIVE codes AS (
+            SELECT MIN({column}) as {column} FROM retail_sales
+            UNION ALL
+            SELECT (SELECT MIN({column}) FROM retail_sales WHERE {column} > codes.{column})
+            FROM codes
+            WHERE codes.{column} IS NOT NULL
+        )
+        SELECT {column} FROM codes WHERE {column} IS NOT NULL ORDER BY {column}
+    """
+
+def used_codes_query(dimension):
+    """
+    Codes of a dimension with at least one sales_facts row (compact layout)
+    
+    One primary-key probe per mapping row: the retail_sales view joins the
+    mapping tables, so the loose index scan above cannot be used through it.
+    """
+    return f"""
+        SELECT d.{dimension}_code as {dimension} FROM {dimension}_mapping d
+        WHERE EXISTS (SELECT 1 FROM sales_facts f WHERE f.{dimension}_id = d.{dimension}_id)
+        ORDER BY {dimension}
+    """
+
+class DimensionRegistry:
+    """
+    In-process copy of the category and state dimensions
+    
+    Holds the mapping tables plus the codes actually present in retail_sales,
+    so /categories and /states are served from memory and fact queries can
+    return bare codes that are decorated with names here instead of joining
+    the mapping tables on every row. Reloaded whenever the data version changes.
+    """
+    
+    def __init__(self):
+        self.category_names = {}
+        self.state_names = {}
+        self.category_codes = []
+        self.state_codes = []
+        self.version = None
+        self._lock = asyncio.Lock()
+    
+    async def load(self, engine, version):
+        """Load the dimension tables and the codes in use from the database"""
+        categories = await read_sql(
+            engine, "SELECT category_code, category_name FROM category_mapping"
+        )
+        states = await read_sql(
+            engine, "SELECT state_code, state_name, state_full_name FROM state_mapping"
+        )
+        layout = await read_sql(engine, "SELECT to_regclass('sales_facts') IS NOT NULL as compact")
+        codes_query = used_codes_query if layout['compact'].iloc[0] else distinct_values_query
+        category_codes = await read_sql(engine, codes_query('category'))
+        state_codes = await read_sql(engine, codes_query('state'))
+        
+        # Build everything first, then swap so readers never see a half-loaded registry
+        category_names = dict(zip(categories['category_code'], categories['category_name']))
+        state_names = {
+            row.state_code: (row.state_name, row.state_full_name)
+            for row in states.itertuples()
+        }
+        
+        self.category_names = category_names
+        self.state_names = state_names
+        self.category_codes = category_codes['category'].tolist()
+        self.state_codes = state_codes['state'].tolist()
+        self.version = version
+    
+    async def ensure_current(self, engine, version):
+        """Reload if the registry was built for a different data version"""
+        if self.version == version:
+            return self
+        
+        async with self._lock:
+            if self.version != version:
+                await self.load(engine, version)
+        
+        return self
+    
+    def category_name(self, code):
+        return self.category_names.get(code, code)
+    
+    def state_name(self, code):
+        return self.state_names.get(code, (code, code))[0]
+    
+    def state_full_name(self, code):
+        return self.state_names.get(code, (code, code))[1]
+    
+    def categories(self):
+        """Categories present in retail_sales with their names"""
+        return [
+            {'category_code': code, 'category_name': self.category_name(code)}
+            for code in self.category_codes
+        ]
+    
+    def states(self):
+        """States present in retail_sales with their names"""
+        return [
+            {
+                'state_code': code,
+                'state_name': self.state_name(code),
+                'state_full_name': self.state_full_name(code)
+            }
+            for code in self.state_codes
+        ]
+    
+    def decorate(self, df):
+        """
+        Add name columns next to category_code / state_code in a fact DataFrame
+        
+        Unmapped codes fall back to the code itself, as the old COALESCE joins did.
+        """
+        if 'category_code' in df.columns:
+            codes = df['category_code']
+            names = codes.map(self.category_names).fillna(codes)
+            df.insert(df.columns.get_loc('category_code') + 1, 'category_name', names)
+        
+        if 'state_code' in df.columns:
+            codes = df['state_code']
+            short = {code: names[0] for code, names in self.state_names.items()}
+            full = {code: names[1] for code, names in self.state_names.items()}
+            position = df.columns.get_loc('state_code') + 1
+            df.insert(position, 'state_name', codes.map(short).fillna(codes))
+            df.insert(position + 1, 'state_full_name', codes.map(full).fillna(codes))
+        
+        return df
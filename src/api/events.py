@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+# SSE event name announced when each dataset gets a new data version
+EVENT_NAMES = {
+    'retail_sales': 'data_version',
+    'sales_forecasts': 'forecast_run',
+}
+
+def format_event(event, data, event_id=None):
+    """Encode one server-sent event"""
+    lines = [f"event: {event}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+class Broadcaster:
+    """
+    In-process fan-out of events to SSE subscribers
+    
+    Each subscriber gets a small queue. A subscriber that falls behind loses
+    its oldest events rather than blocking the publisher; version events
+    supersede each other, so only the latest ones matter.
+    """
+    
+    def __init__(self, queue_size=16):
+        self.queue_size = queue_size
+        self._subscribers = set()
+    
+    def __len__(self):
+        return len(self._subscribers)
+    
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+    
+    def publish(self, event, data, event_id=None):
+        message = (event, data, event_id)
+        
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+async def watch_versions(tracker, broadcaster, interval):
+    """Poll published data versions and broadcast every change (runs until cancelled)"""
+    previous = None
+    
+    while True:
+        try:
+            tracker.invalidate()
+            versions = await tracker.current()
+            key = await tracker.key()
+            
+            if previous is not None:
+                for dataset, version in versions.items():
+                    if previous.get(dataset) != version:
+                        broadcaster.publish(
+                            EVENT_NAMES.get(dataset, 'data_version'),
+                            {"dataset": dataset, "version": version, "key": key},
+                            key
+                        )
+            
+            previous = versions
+        except Exception as e:
+            print(f"⚠️ Version watcher could not read data versions: {e}")
+        
+        await asyncio.sleep(interval)
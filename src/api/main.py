@@ -1,22 +1,107 @@
-from fastapi import FastAPI, HTTPException, Query
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Taken before the heavy imports below, for the startup profile
+IMPORTS_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, text
+from pydantic import BaseModel, Field
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+import asyncio
 import pandas as pd
 import numpy as np
-import os
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, List
 
+from api.db import get_async_engine, read_sql, set_route_timeouts
+from api.admission import AdmissionMiddleware
+from api.cache import ResponseCache
+from api.compression import CompressionMiddleware
+from api.data_version import DataVersionTracker
+from api.dimensions import DimensionRegistry
+from api.events import Broadcaster, format_event, watch_versions
+from api.metrics import MetricsMiddleware, metrics_response, track_pool, track_subscribers
+from api.shared_cache import get_shared_cache
+from api.snapshot import PERIOD_MONTHS, SnapshotStore
+from api.serialization import array_response, columnar_response, json_response
+from api.startup import StartupProfile, warm_up, warmup_enabled
+
 load_dotenv()
 
+startup_profile = StartupProfile(IMPORTS_STARTED)
+startup_profile.mark('imports')
+
+# Responses primed by the startup warm-up: what a dashboard loads first
+WARMUP_PATHS = ('/sales/summary', '/forecasts/summary', '/categories', '/states')
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Start serving immediately and warm up in the background
+    
+    The pool, dimension registry, sales snapshot and summary responses are
+    loaded by a background task, so a cold database (or a slow first
+    connection) neither delays nor stops startup. Set STARTUP_WARMUP=0 to
+    load everything on first use instead.
+    """
+    warmup = None
+    if warmup_enabled():
+        prime = [get_dimensions]
+        if sales_snapshot.enabled:
+            prime.append(get_sales_snapshot)
+        warmup = asyncio.create_task(
+            warm_up(app, engine, startup_profile, prime=prime, paths=WARMUP_PATHS)
+        )
+    
+    watcher = asyncio.create_task(watch_versions(data_versions, broadcaster, EVENTS_POLL_SECONDS))
+    startup_profile.mark('ready')
+    yield
+    
+    # Let the tasks unwind (and return their connections) before the pool closes
+    tasks = [task for task in (warmup, watcher) if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await engine.dispose()
+
 # Initialize FastAPI
 app = FastAPI(
     title="Australian Retail Intelligence API",
     description="Production API for Australian retail sales forecasts and historical data (1982-2024)",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Bound concurrent expensive requests per route (large pulls and full
+# scans); innermost, so cache hits are never queued
+app.add_middleware(
+    AdmissionMiddleware,
+    routes=('/sales', '/forecasts', '/sales/aggregate', '/accuracy', '/series/batch')
+)
+
+# Serve hot GET responses from a per-data-version cache and compress
+# responses (brotli/gzip). Registered before CORS so that cached
+# responses still pass through the CORS middleware.
+CACHEABLE_PATHS = ('/sales', '/forecasts', '/accuracy', '/series', '/insights', '/categories', '/states')
+
+# Optional cache tier shared by all workers on this host (SHARED_CACHE_PATH)
+shared_cache = get_shared_cache()
+
+response_cache = ResponseCache(shared=shared_cache)
+app.add_middleware(
+    CompressionMiddleware,
+    cache=response_cache,
+    version_key=lambda: data_versions.key(),
+    cacheable_paths=CACHEABLE_PATHS
 )
 
 # Enable CORS (allow API access from any domain)
@@ -28,22 +113,116 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database connection
-def get_db_engine():
-    connection_string = (
-        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
-        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    )
-    return create_engine(connection_string, pool_pre_ping=True)
+# Prometheus metrics (outermost, so cache hits and CORS are measured too;
+# long-lived event streams would only distort the latency histograms)
+app.add_middleware(MetricsMiddleware, skip_paths=('/metrics', '/events'))
+
+# Database connection (async pool; see api/db.py for tuning variables)
+engine = get_async_engine()
+track_pool(engine)
+
+# Server-side statement timeouts (seconds) for routes that can run long
+# scans; other queries are bounded by DB_STATEMENT_TIMEOUT
+set_route_timeouts({
+    '/sales': 20,
+    '/forecasts': 20,
+    '/sales/aggregate': 15,
+    '/sales/changes': 15,
+    '/accuracy': 15,
+    '/series/batch': 15,
+    '/series/{category}/{state}': 10,
+    '/insights/top-movers': 5,
+})
+
+# Published data versions and in-memory dimension tables
+data_versions = DataVersionTracker(engine)
+dimensions = DimensionRegistry()
+
+# New data versions and forecast runs are pushed to /events subscribers
+EVENTS_POLL_SECONDS = float(os.getenv('EVENTS_POLL_SECONDS', '15'))
+EVENTS_HEARTBEAT_SECONDS = 20
+
+broadcaster = Broadcaster()
+track_subscribers(broadcaster)
+
+# Optional in-memory columnar copy of retail_sales (SALES_SNAPSHOT=1)
+sales_snapshot = SnapshotStore(shared=shared_cache)
+
+async def get_dimensions():
+    """Dimension registry, reloaded when the published data version changes"""
+    return await dimensions.ensure_current(engine, await data_versions.key())
+
+async def get_sales_snapshot():
+    """Current sales snapshot, or None when disabled or unavailable (query the DB instead)"""
+    if not sales_snapshot.enabled:
+        return None
+    
+    try:
+        versions = await data_versions.current()
+        return await sales_snapshot.get(engine, versions.get('retail_sales', 0))
+    except Exception as e:
+        print(f"⚠️ Sales snapshot unavailable, using database: {e}")
+        return None
+
+def parse_date(value, name):
+    """Parse an optional YYYY-MM-DD query parameter (asyncpg needs real dates)"""
+    if value is None:
+        return None
+    
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} '{value}' (expected YYYY-MM-DD)")
+
+def build_sales_filters(category=None, state=None, start=None, end=None):
+    """SQL conditions (on alias rs) and bind parameters for retail_sales filters"""
+    conditions = ""
+    params = {}
+    
+    if category:
+        conditions += " AND rs.category = :category"
+        params['category'] = category
+    
+    if state:
+        conditions += " AND rs.state = :state"
+        params['state'] = state
+    
+    if start:
+        conditions += " AND rs.sale_date >= :start_date"
+        params['start_date'] = start
+    
+    if end:
+        conditions += " AND rs.sale_date <= :end_date"
+        params['end_date'] = end
+    
+    return conditions, params
 
-engine = get_db_engine()
+async def read_dataset_summary(dataset, columns, fallback_query):
+    """
+    Read a dataset's precomputed row from dataset_summary
+    
+    Falls back to aggregating the full table if the summary
+    has not been built yet (e.g. before the first load).
+    """
+    select_list = ", ".join(f"{source} as {alias}" for alias, source in columns.items())
+    query = f"SELECT {select_list} FROM dataset_summary WHERE dataset = :dataset"
+    
+    try:
+        df = await read_sql(engine, query, {'dataset': dataset})
+    except ProgrammingError:
+        df = pd.DataFrame()
+    
+    if df.empty:
+        df = await read_sql(engine, fallback_query)
+    
+    return df.to_dict(orient='records')[0]
 
 # ============================================================================
 # ROOT ENDPOINT
 # ============================================================================
 
 @app.get("/")
-def root():
+async def root():
     """Welcome endpoint with API information"""
     return {
         "message": "Australian Retail Intelligence API",
@@ -59,8 +238,16 @@ def root():
         "endpoints": {
             "documentation": "/docs",
             "health": "/health",
+            "metrics": "/metrics",
             "forecasts": "/forecasts",
             "historical": "/sales",
+            "events": "/events",
+            "aggregate": "/sales/aggregate",
+            "changes": "/sales/changes",
+            "accuracy": "/accuracy",
+            "top_movers": "/insights/top-movers",
+            "series": "/series/{category}/{state}",
+            "series_batch": "/series/batch",
             "categories": "/categories",
             "states": "/states"
         },
@@ -72,16 +259,17 @@ def root():
 # ============================================================================
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Check API and database health"""
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT 1"))
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT 1"))
             result.fetchone()
         
         return {
             "status": "healthy",
             "database": "connected",
+            "startup_ms": startup_profile.report(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -92,15 +280,55 @@ def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: request counts, latency by stage, sizes, pool and cache"""
+    return metrics_response()
+
+@app.get("/events")
+async def events(request: Request):
+    """
+    Server-sent events announcing newly published data
+    
+    Sends a `versions` event on connect, then `data_version` when a new ABS
+    load is published and `forecast_run` when new forecasts are, each with
+    the dataset, its version and the combined version key (also the event
+    id). Clients can refresh on these events instead of polling.
+    """
+    async def stream():
+        queue = broadcaster.subscribe()
+        try:
+            versions = await data_versions.current()
+            key = await data_versions.key()
+            yield format_event('versions', {"versions": versions, "key": key}, key)
+            
+            while True:
+                try:
+                    event, data, event_id = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                    yield format_event(event, data, event_id)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # ============================================================================
 # FORECAST ENDPOINTS
 # ============================================================================
 
 @app.get("/forecasts")
-def get_forecasts(
+async def get_forecasts(
     category: Optional[str] = Query(None, description="Retail category (e.g., '20')"),
     state: Optional[str] = Query(None, description="Australian state (e.g., 'AUS', 'NSW')"),
-    limit: int = Query(96000, ge=1, le=100000, description="Number of records (default 96000)")
+    limit: int = Query(96000, ge=1, le=100000, description="Number of records (default 96000)"),
+    shape: str = Query("records", pattern="^(records|columnar)$", description="'records' (list of row objects) or 'columnar' (one array per column)")
 ):
     """
     Get retail sales forecasts WITH proper state and category names
@@ -108,16 +336,14 @@ def get_forecasts(
     - **category**: Filter by retail category (optional)
     - **state**: Filter by Australian state (optional)
     - **limit**: Maximum number of records (default 96000)
+    - **shape**: `records` (default) or `columnar` for compact one-array-per-column output
     """
     try:
         query = """
             SELECT 
                 sf.forecast_date,
                 sf.category as category_code,
-                COALESCE(cm.category_name, sf.category) as category_name,
                 sf.state as state_code,
-                COALESCE(sm.state_name, sf.state) as state_name,
-                COALESCE(sm.state_full_name, sf.state) as state_full_name,
                 sf.predicted_turnover,
                 sf.lower_bound,
                 sf.upper_bound,
@@ -125,8 +351,6 @@ def get_forecasts(
                 sf.model_name,
                 sf.model_version
             FROM sales_forecasts sf
-            LEFT JOIN state_mapping sm ON sf.state = sm.state_code
-            LEFT JOIN category_mapping cm ON sf.category = cm.category_code
             WHERE 1=1
         """
         
@@ -143,11 +367,19 @@ def get_forecasts(
         query += " ORDER BY sf.forecast_date LIMIT :limit"
         params['limit'] = limit
         
-        df = pd.read_sql(text(query), engine, params=params)
+        df = await read_sql(engine, query, params)
         
         if df.empty:
             raise HTTPException(status_code=404, detail="No forecasts found")
         
+        dims = await get_dimensions()
+        
+        if shape == "columnar":
+            return columnar_response(df, dims, date_column='forecast_date')
+        
+        # Add category/state names from the in-memory registry
+        df = dims.decorate(df)
+        
         # Replace NaN/NA values with None (JSON compliant)
         df = df.replace({np.nan: None, pd.NA: None, pd.NaT: None})
         df = df.where(pd.notna(df), None)
@@ -155,21 +387,152 @@ def get_forecasts(
         # Convert to dict and format dates
         df['forecast_date'] = df['forecast_date'].astype(str)
         
-        return {
+        return json_response({
             "count": len(df),
             "forecasts": df.to_dict(orient='records')
-        }
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/accuracy")
+async def get_accuracy(
+    category: Optional[str] = Query(None, description="Retail category (e.g., '20')"),
+    state: Optional[str] = Query(None, description="Australian state (e.g., 'AUS')"),
+    run: Optional[str] = Query(None, description="Forecast run (model_version); default all published runs")
+):
+    """
+    Get forecast accuracy against actuals, per series and horizon
+    
+    Forecasts are joined to retail_sales on (category, state, month) in the
+    database. Horizon h is the h-th forecast month of a series within its run.
+    For each series the response gives overall and per-horizon:
+    
+    - **mae**: mean absolute error (millions)
+    - **mape**: mean absolute percentage error (%)
+    - **bias**: mean of forecast - actual (positive = over-forecast)
+    
+    Only forecast months that already have actuals are scored.
+    """
+    try:
+        conditions = ""
+        params = {}
         
+        if category:
+            conditions += " AND sf.category = :category"
+            params['category'] = category
+        
+        if state:
+            conditions += " AND sf.state = :state"
+            params['state'] = state
+        
+        if run:
+            conditions += " AND sf.model_version = :run"
+            params['run'] = run
+        
+        # Per (series, run, horizon) plus a per-(series, run) row with horizon NULL
+        query = f"""
+            WITH fc AS (
+                SELECT 
+                    sf.category,
+                    sf.state,
+                    sf.model_version,
+                    sf.forecast_date,
+                    sf.predicted_turnover,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY sf.category, sf.state, sf.model_version
+                        ORDER BY sf.forecast_date
+                    ) as horizon
+                FROM sales_forecasts sf
+                WHERE 1=1 {conditions}
+            ),
+            errors AS (
+                SELECT 
+                    fc.category,
+                    fc.state,
+                    fc.model_version,
+                    fc.horizon,
+                    fc.predicted_turnover - rs.turnover_millions as error,
+                    rs.turnover_millions as actual
+                FROM fc
+                JOIN retail_sales rs
+                    ON rs.category = fc.category
+                    AND rs.state = fc.state
+                    AND rs.sale_date = fc.forecast_date
+            )
+            SELECT 
+                category as category_code,
+                state as state_code,
+                model_version as run,
+                horizon,
+                COUNT(*) as n,
+                ROUND(AVG(ABS(error)), 4) as mae,
+                ROUND(AVG(ABS(error) / NULLIF(ABS(actual), 0)) * 100, 4) as mape,
+                ROUND(AVG(error), 4) as bias
+            FROM errors
+            GROUP BY GROUPING SETS (
+                (category, state, model_version, horizon),
+                (category, state, model_version)
+            )
+            ORDER BY category, state, model_version, horizon NULLS FIRST
+        """
+        
+        df = await read_sql(engine, query, params)
+        
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No forecasts with matching actuals found")
+        
+        dims = await get_dimensions()
+        df['horizon'] = df['horizon'].astype('Int64')
+        df = df.astype(object).where(pd.notna(df), None)
+        metrics = ['n', 'mae', 'mape', 'bias']
+        
+        series = []
+        for (category_code, state_code, run_name), group in df.groupby(
+            ['category_code', 'state_code', 'run'], sort=False, dropna=False
+        ):
+            overall = group[group['horizon'].isna()]
+            by_horizon = group[group['horizon'].notna()]
+            
+            series.append({
+                "category_code": category_code,
+                "category_name": dims.category_name(category_code),
+                "state_code": state_code,
+                "state_name": dims.state_name(state_code),
+                "state_full_name": dims.state_full_name(state_code),
+                "run": run_name,
+                "overall": overall[metrics].to_dict(orient='records')[0],
+                "horizons": by_horizon[['horizon'] + metrics].to_dict(orient='records')
+            })
+        
+        return json_response({
+            "count": len(series),
+            "series": series
+        })
+    
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/forecasts/summary")
-def get_forecast_summary():
+async def get_forecast_summary():
     """Get summary statistics of all forecasts"""
     try:
-        query = """
+        columns = {
+            'total_forecasts': 'total_records',
+            'categories': 'categories',
+            'states': 'states',
+            'earliest_forecast': 'earliest_date',
+            'latest_forecast': 'latest_date',
+            'avg_prediction': 'avg_value',
+            'min_prediction': 'min_value',
+            'max_prediction': 'max_value'
+        }
+        
+        fallback_query = """
             SELECT 
                 COUNT(*) as total_forecasts,
                 COUNT(DISTINCT category) as categories,
@@ -182,15 +545,16 @@ def get_forecast_summary():
             FROM sales_forecasts
         """
         
-        df = pd.read_sql(text(query), engine)
-        result = df.to_dict(orient='records')[0]
+        result = await read_dataset_summary('sales_forecasts', columns, fallback_query)
         
         # Format dates
         result['earliest_forecast'] = str(result['earliest_forecast'])
         result['latest_forecast'] = str(result['latest_forecast'])
         
-        return result
-        
+        return json_response(result)
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -199,12 +563,14 @@ def get_forecast_summary():
 # ============================================================================
 
 @app.get("/sales")
-def get_sales(
+async def get_sales(
     category: Optional[str] = Query(None, description="Retail category"),
     state: Optional[str] = Query(None, description="Australian state"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    limit: int = Query(96000, ge=1, le=100000, description="Number of records (default 96000)")
+    limit: int = Query(96000, ge=1, le=100000, description="Number of records (default 96000)"),
+    shape: str = Query("records", pattern="^(records|columnar)$", description="'records' (list of row objects) or 'columnar' (one array per column)"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (e.g., 'sale_date,category_code,turnover_millions')")
 ):
     """
     Get historical retail sales data WITH proper state and category names
@@ -214,74 +580,87 @@ def get_sales(
     - **start_date**: Filter from this date (optional)
     - **end_date**: Filter until this date (optional)
     - **limit**: Maximum records (default 96000)
+    - **shape**: `records` (default) or `columnar` for compact one-array-per-column output
+    - **fields**: Only return these columns (optional, default all)
     """
+    start = parse_date(start_date, 'start_date')
+    end = parse_date(end_date, 'end_date')
+    output_fields = parse_fields(fields, SALES_FIELDS)
+    
+    # Name fields are decorated in memory and need their code column selected
+    names = [f for f in output_fields if f in NAME_FIELD_CODES]
+    needed = set(output_fields) | {NAME_FIELD_CODES[f] for f in names}
+    select_fields = [field for field, sql in SALES_FIELDS.items() if sql and field in needed]
+    
     try:
-        query = """
-            SELECT 
-                rs.sale_date,
-                rs.category as category_code,
-                COALESCE(cm.category_name, rs.category) as category_name,
-                rs.state as state_code,
-                COALESCE(sm.state_name, rs.state) as state_name,
-                COALESCE(sm.state_full_name, rs.state) as state_full_name,
-                rs.turnover_millions,
-                rs.month_name,
-                rs.year,
-                rs.growth_rate_yoy
-            FROM retail_sales rs
-            LEFT JOIN state_mapping sm ON rs.state = sm.state_code
-            LEFT JOIN category_mapping cm ON rs.category = cm.category_code
-            WHERE 1=1
-        """
+        snapshot = await get_sales_snapshot()
         
-        params = {}
+        if snapshot is not None:
+            df = snapshot.query(select_fields, category, state, start, end, limit)
+        else:
+            query = f"""
+                SELECT 
+                    {", ".join(SALES_FIELDS[field] for field in select_fields)}
+                FROM retail_sales rs
+                WHERE 1=1
+            """
+            
+            conditions, params = build_sales_filters(category, state, start, end)
+            
+            query += conditions
+            query += " ORDER BY rs.sale_date DESC LIMIT :limit"
+            params['limit'] = limit
+            
+            df = await read_sql(engine, query, params)
         
-        if category:
-            query += " AND rs.category = :category"
-            params['category'] = category
-        
-        if state:
-            query += " AND rs.state = :state"
-            params['state'] = state
-        
-        if start_date:
-            query += " AND rs.sale_date >= :start_date"
-            params['start_date'] = start_date
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No sales data found")
         
-        if end_date:
-            query += " AND rs.sale_date <= :end_date"
-            params['end_date'] = end_date
+        dims = await get_dimensions()
         
-        query += " ORDER BY rs.sale_date DESC LIMIT :limit"
-        params['limit'] = limit
+        if shape == "columnar":
+            # Names travel in the lookup table, keyed by the code columns
+            return columnar_response(df, dims, date_column='sale_date')
         
-        df = pd.read_sql(text(query), engine, params=params)
-        
-        if df.empty:
-            raise HTTPException(status_code=404, detail="No sales data found")
+        # Add category/state names from the in-memory registry
+        if names:
+            df = dims.decorate(df)
+        df = df[output_fields]
         
         # Replace NaN/NA values with None (JSON compliant)
         df = df.replace({np.nan: None, pd.NA: None, pd.NaT: None})
         df = df.where(pd.notna(df), None)
         
         # Convert dates
-        df['sale_date'] = df['sale_date'].astype(str)
+        if 'sale_date' in df.columns:
+            df['sale_date'] = df['sale_date'].astype(str)
         
-        return {
+        return json_response({
             "count": len(df),
             "sales": df.to_dict(orient='records')
-        }
-        
+        })
+    
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/sales/summary")
-def get_sales_summary():
+async def get_sales_summary():
     """Get summary statistics of historical sales"""
     try:
-        query = """
+        columns = {
+            'total_records': 'total_records',
+            'earliest_date': 'earliest_date',
+            'latest_date': 'latest_date',
+            'categories': 'categories',
+            'states': 'states',
+            'avg_turnover': 'avg_value',
+            'min_turnover': 'min_value',
+            'max_turnover': 'max_value'
+        }
+        
+        fallback_query = """
             SELECT 
                 COUNT(*) as total_records,
                 MIN(sale_date) as earliest_date,
@@ -294,66 +673,602 @@ def get_sales_summary():
             FROM retail_sales
         """
         
-        df = pd.read_sql(text(query), engine)
-        result = df.to_dict(orient='records')[0]
+        result = await read_dataset_summary('retail_sales', columns, fallback_query)
         
         # Format dates
         result['earliest_date'] = str(result['earliest_date'])
         result['latest_date'] = str(result['latest_date'])
         
-        return result
+        return json_response(result)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Output fields of /sales in response order, with the SQL that produces them.
+# Name fields have no SQL: they are added from the dimension registry using
+# the code column they depend on.
+SALES_FIELDS = {
+    'sale_date': "rs.sale_date",
+    'category_code': "rs.category as category_code",
+    'category_name': None,
+    'state_code': "rs.state as state_code",
+    'state_name': None,
+    'state_full_name': None,
+    'turnover_millions': "rs.turnover_millions",
+    'month_name': "rs.month_name",
+    'year': "rs.year",
+    'growth_rate_yoy': "rs.growth_rate_yoy",
+}
+
+NAME_FIELD_CODES = {
+    'category_name': 'category_code',
+    'state_name': 'state_code',
+    'state_full_name': 'state_code',
+}
+
+def parse_fields(fields, available):
+    """Parse a comma-separated fields parameter into known fields, in response order"""
+    if not fields:
+        return list(available)
+    
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - set(available))
+    
+    if unknown or not requested:
+        problem = f"Unknown fields {unknown}" if unknown else "No fields requested"
+        raise HTTPException(
+            status_code=400,
+            detail=f"{problem}; choose from {list(available)}"
+        )
+    
+    return [f for f in available if f in requested]
+
+# Grouping keys for /sales/aggregate
+AGGREGATE_GROUPS = {
+    'year': ["EXTRACT(YEAR FROM rs.sale_date)::int AS year"],
+    'quarter': [
+        "EXTRACT(YEAR FROM rs.sale_date)::int AS year",
+        "EXTRACT(QUARTER FROM rs.sale_date)::int AS quarter"
+    ],
+    'state': ["rs.state AS state_code"],
+    'category': ["rs.category AS category_code"],
+}
+
+def build_aggregate_query(group_by, metric, conditions):
+    """GROUP BY query for /sales/aggregate returning key columns, value and records"""
+    keys = AGGREGATE_GROUPS[group_by]
+    key_names = [key.split(" AS ")[1] for key in keys]
+    key_list = ", ".join(key_names)
+    positions = ", ".join(str(i + 1) for i in range(len(keys)))
+    
+    if metric in ('sum', 'avg'):
+        return f"""
+            SELECT 
+                {", ".join(keys)},
+                {metric.upper()}(rs.turnover_millions) as value,
+                COUNT(*) as records
+            FROM retail_sales rs
+            WHERE 1=1 {conditions}
+            GROUP BY {positions}
+            ORDER BY {positions}
+        """
+    
+    if group_by in ('year', 'quarter'):
+        # Growth of each period's total over the same period a year earlier;
+        # null unless both periods have all their months (PERIOD_MONTHS)
+        same_quarter = " AND p.quarter = t.quarter" if group_by == 'quarter' else ""
+        return f"""
+            WITH totals AS (
+                SELECT 
+                    {", ".join(keys)},
+                    SUM(rs.turnover_millions) as total,
+                    COUNT(*) as records,
+                    COUNT(DISTINCT rs.sale_date) as months
+                FROM retail_sales rs
+                WHERE 1=1 {conditions}
+                GROUP BY {positions}
+            )
+            SELECT 
+                {", ".join(f"t.{name}" for name in key_names)},
+                CASE WHEN t.months = {PERIOD_MONTHS[group_by]} AND p.months = {PERIOD_MONTHS[group_by]}
+                    THEN ROUND((t.total / NULLIF(p.total, 0) - 1) * 100, 2)
+                END as value,
+                t.records
+            FROM totals t
+            LEFT JOIN totals p ON p.year = t.year - 1{same_quarter}
+            ORDER BY {", ".join(f"t.{name}" for name in key_names)}
+        """
+    
+    # State/category growth: latest 12 months vs the 12 months before them
+    return f"""
+        WITH bounds AS (
+            SELECT MAX(rs.sale_date) as latest
+            FROM retail_sales rs
+            WHERE 1=1 {conditions}
+        ),
+        totals AS (
+            SELECT 
+                {", ".join(keys)},
+                SUM(rs.turnover_millions) FILTER (
+                    WHERE rs.sale_date > b.latest - INTERVAL '12 months'
+                ) as current_total,
+                SUM(rs.turnover_millions) FILTER (
+                    WHERE rs.sale_date <= b.latest - INTERVAL '12 months'
+                    AND rs.sale_date > b.latest - INTERVAL '24 months'
+                ) as previous_total,
+                COUNT(*) as records
+            FROM retail_sales rs, bounds b
+            WHERE rs.sale_date > b.latest - INTERVAL '24 months' {conditions}
+            GROUP BY {positions}
+        )
+        SELECT 
+            {key_list},
+            ROUND((current_total / NULLIF(previous_total, 0) - 1) * 100, 2) as value,
+            records
+        FROM totals
+        ORDER BY {key_list}
+    """
+
+@app.get("/sales/aggregate")
+async def get_sales_aggregate(
+    group_by: str = Query(..., pattern="^(year|quarter|state|category)$", description="Rollup level: year, quarter, state or category"),
+    metric: str = Query("sum", pattern="^(sum|avg|yoy)$", description="sum / avg of turnover, or yoy growth (%)"),
+    category: Optional[str] = Query(None, description="Retail category"),
+    state: Optional[str] = Query(None, description="Australian state"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
+):
+    """
+    Get historical sales rolled up server-side
+    
+    - **group_by**: `year`, `quarter`, `state` or `category`
+    - **metric**: `sum` or `avg` of turnover (millions), or `yoy` growth (%).
+      For year/quarter, yoy compares each period with the same period a year
+      earlier (null when either period is missing months, e.g. the first
+      year or a date-filter cut); for state/category it compares the latest
+      12 months with the 12 months before them.
+    - **category**, **state**, **start_date**, **end_date**: optional filters
+    
+    Category '20' and state 'AUS' are totals, so filter on them (e.g.
+    `group_by=category&state=AUS`) to avoid double counting.
+    """
+    start = parse_date(start_date, 'start_date')
+    end = parse_date(end_date, 'end_date')
+    
+    try:
+        snapshot = await get_sales_snapshot()
+        
+        if snapshot is not None:
+            df = snapshot.aggregate(group_by, metric, category, state, start, end)
+        else:
+            conditions, params = build_sales_filters(category, state, start, end)
+            query = build_aggregate_query(group_by, metric, conditions)
+            
+            df = await read_sql(engine, query, params)
         
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No sales data found")
+        
+        df = (await get_dimensions()).decorate(df)
+        df = df.astype(object).where(pd.notna(df), None)
+        
+        return json_response({
+            "group_by": group_by,
+            "metric": metric,
+            "unit": "percent" if metric == "yoy" else "millions",
+            "count": len(df),
+            "rows": df.to_dict(orient='records')
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+CHANGE_OPS = {'I': 'insert', 'U': 'update', 'D': 'delete'}
+
+@app.get("/sales/changes")
+async def get_sales_changes(
+    since: int = Query(..., ge=0, description="retail_sales data version the client already has")
+):
+    """
+    Get sales rows inserted, revised or deleted after a data version
+    
+    Returns each changed (category, state, sale_date) row once, with its
+    latest operation and values, up to the current published `version`.
+    Store `version` and pass it as `since` on the next sync. Answers 410 if
+    the change history no longer reaches back to `since` (e.g. after a table
+    rebuild); re-pull `/sales` in that case. Answers 400 for a `since` newer
+    than the current version and 404 when the change log is not set up.
+    """
+    try:
+        current = (await data_versions.current()).get('retail_sales', 0)
+        params = {'since': since, 'current': current}
+        
+        if since > current:
+            raise HTTPException(
+                status_code=400,
+                detail=f"since={since} is newer than the current version {current}"
+            )
+        
+        not_set_up = HTTPException(
+            status_code=404,
+            detail="Change log not set up (run src/utils/create_change_log.py)"
+        )
+        try:
+            # Without an 'R' row the triggers were never installed (the table
+            # alone stays empty), so there is no history to answer from
+            reset = await read_sql(engine, """
+                SELECT
+                    MAX(data_version) FILTER (WHERE data_version <= :current) as version,
+                    COUNT(*) as markers
+                FROM retail_sales_changes
+                WHERE op = 'R'
+            """, params)
+        except ProgrammingError:
+            raise not_set_up
+        
+        if reset['markers'].iloc[0] == 0:
+            raise not_set_up
+        
+        reset_version = reset['version'].iloc[0]
+        if pd.notna(reset_version) and since < reset_version:
+            raise HTTPException(
+                status_code=410,
+                detail=f"Changes before version {int(reset_version)} are not available; re-pull /sales"
+            )
+        
+        df = await read_sql(engine, """
+            SELECT * FROM (
+                SELECT DISTINCT ON (c.category, c.state, c.sale_date)
+                    c.data_version as version,
+                    c.op,
+                    c.sale_date,
+                    c.category as category_code,
+                    c.state as state_code,
+                    c.turnover_millions,
+                    c.growth_rate_yoy
+                FROM retail_sales_changes c
+                WHERE c.data_version > :since
+                AND c.data_version <= :current
+                AND c.op != 'R'
+                ORDER BY c.category, c.state, c.sale_date, c.change_id DESC
+            ) latest
+            ORDER BY version, category_code, state_code, sale_date
+        """, params)
+        
+        df['op'] = df['op'].map(CHANGE_OPS)
+        df['sale_date'] = df['sale_date'].astype(str)
+        df = df.astype(object).where(pd.notna(df), None)
+        
+        return json_response({
+            "since": since,
+            "version": current,
+            "count": len(df),
+            "changes": df.to_dict(orient='records')
+        })
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============================================================================
-# METADATA ENDPOINTS
+# SERIES ENDPOINTS
 # ============================================================================
 
-@app.get("/categories")
-def get_categories():
-    """Get list of all retail categories WITH proper names"""
+class SeriesSelector(BaseModel):
+    category: str = Field(..., description="Retail category (e.g., '20')")
+    state: str = Field(..., description="Australian state (e.g., 'AUS')")
+    start_date: Optional[date] = Field(None, description="Start date (YYYY-MM-DD)")
+    end_date: Optional[date] = Field(None, description="End date (YYYY-MM-DD)")
+
+class SeriesBatchRequest(BaseModel):
+    series: List[SeriesSelector] = Field(..., min_length=1, max_length=100)
+
+@app.post("/series/batch")
+async def get_series_batch(request: SeriesBatchRequest):
+    """
+    Get several historical series in one call
+    
+    All selectors are answered by a single `(category, state) IN (...)` query;
+    each selector's own date range is applied afterwards. Results come back in
+    the order requested, each in ascending date order.
+    """
     try:
-        query = """
-            SELECT DISTINCT 
+        pairs = list(dict.fromkeys((s.category, s.state) for s in request.series))
+        
+        params = {}
+        placeholders = []
+        for i, (category, state) in enumerate(pairs):
+            placeholders.append(f"(:category_{i}, :state_{i})")
+            params[f'category_{i}'] = category
+            params[f'state_{i}'] = state
+        
+        query = f"""
+            SELECT 
+                rs.sale_date,
                 rs.category as category_code,
-                COALESCE(cm.category_name, rs.category) as category_name
+                rs.state as state_code,
+                rs.turnover_millions,
+                rs.growth_rate_yoy
             FROM retail_sales rs
-            LEFT JOIN category_mapping cm ON rs.category = cm.category_code
-            ORDER BY rs.category
+            WHERE (rs.category, rs.state) IN ({", ".join(placeholders)})
         """
         
-        df = pd.read_sql(text(query), engine)
+        # Only narrow the scan by date when every selector is bounded
+        starts = [s.start_date for s in request.series]
+        ends = [s.end_date for s in request.series]
         
-        return {
-            "count": len(df),
-            "categories": df.to_dict(orient='records')
+        if all(starts):
+            query += " AND rs.sale_date >= :start_date"
+            params['start_date'] = min(starts)
+        
+        if all(ends):
+            query += " AND rs.sale_date <= :end_date"
+            params['end_date'] = max(ends)
+        
+        query += " ORDER BY rs.category, rs.state, rs.sale_date"
+        
+        df = await read_sql(engine, query, params)
+        dims = await get_dimensions()
+        
+        groups = {key: group for key, group in df.groupby(['category_code', 'state_code'])}
+        empty = df.iloc[0:0]
+        
+        results = []
+        for selector in request.series:
+            series = groups.get((selector.category, selector.state), empty)
+            
+            if selector.start_date:
+                series = series[series['sale_date'] >= selector.start_date]
+            if selector.end_date:
+                series = series[series['sale_date'] <= selector.end_date]
+            
+            series = series[['sale_date', 'turnover_millions', 'growth_rate_yoy']].astype(object)
+            series = series.where(pd.notna(series), None)
+            series['sale_date'] = series['sale_date'].astype(str)
+            
+            results.append({
+                "category_code": selector.category,
+                "category_name": dims.category_name(selector.category),
+                "state_code": selector.state,
+                "state_name": dims.state_name(selector.state),
+                "state_full_name": dims.state_full_name(selector.state),
+                "start_date": str(selector.start_date) if selector.start_date else None,
+                "end_date": str(selector.end_date) if selector.end_date else None,
+                "count": len(series),
+                "sales": series.to_dict(orient='records')
+            })
+        
+        return json_response({
+            "count": len(results),
+            "series": results
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Pandas frequency alias of the series grid (month start)
+SERIES_FREQ = "MS"
+
+def monthly_grid(dates, *columns):
+    """
+    Place columns on a gap-free monthly grid starting at the first date
+    
+    Returns (months, arrays): the month of each grid position and one float
+    array per column, NaN where a month has no row, so that position i is
+    always `start + i months`.
+    """
+    months = np.asarray(dates, dtype='datetime64[D]').astype('datetime64[M]')
+    offsets = (months - months[0]).astype(np.int64)
+    grid = months[0] + np.arange(offsets[-1] + 1)
+    
+    arrays = []
+    for column in columns:
+        values = np.full(len(grid), np.nan)
+        values[offsets] = np.asarray(column, dtype=np.float64)
+        arrays.append(values)
+    
+    return grid, arrays
+
+def month_start(month):
+    """datetime.date of a numpy datetime64[M] value"""
+    return month.astype('datetime64[D]').item()
+
+@app.get("/series/{category}/{state}")
+async def get_series(
+    category: str,
+    state: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    forecast: bool = Query(False, description="Append the forecast tail after the last actual")
+):
+    """
+    Get one historical series as a compact monthly array
+    
+    Returns `start`, `freq` ('MS' = monthly, month start) and `values`, where
+    `values[i]` is turnover (millions) for `start + i` months; months without
+    data are null. With `forecast=true`, `forecast` holds the predictions after
+    the last actual month, with `offset` giving their position on the same grid.
+    Responses are cached per series until the next data load or forecast run.
+    """
+    start = parse_date(start_date, 'start_date')
+    end = parse_date(end_date, 'end_date')
+    
+    try:
+        snapshot = await get_sales_snapshot()
+        
+        if snapshot is not None:
+            rows = snapshot.rows(category, state, start, end)
+            dates, turnover = snapshot.dates[rows], snapshot.turnover[rows]
+        else:
+            conditions, params = build_sales_filters(category, state, start, end)
+            df = await read_sql(engine, f"""
+                SELECT rs.sale_date, rs.turnover_millions
+                FROM retail_sales rs
+                WHERE 1=1 {conditions}
+                ORDER BY rs.sale_date
+            """, params)
+            dates, turnover = df['sale_date'], df['turnover_millions']
+        
+        if len(dates) == 0:
+            raise HTTPException(status_code=404, detail="No sales data found")
+        
+        grid, (values,) = monthly_grid(dates, turnover)
+        dims = await get_dimensions()
+        
+        result = {
+            "category_code": category,
+            "category_name": dims.category_name(category),
+            "state_code": state,
+            "state_name": dims.state_name(state),
+            "state_full_name": dims.state_full_name(state),
+            "start": str(month_start(grid[0])),
+            "freq": SERIES_FREQ,
+            "count": len(values),
+            "values": values
         }
         
+        if forecast:
+            fc = await read_sql(engine, """
+                SELECT forecast_date, predicted_turnover, lower_bound, upper_bound
+                FROM sales_forecasts
+                WHERE category = :category AND state = :state
+                AND forecast_date > :last_actual
+                ORDER BY forecast_date
+            """, {'category': category, 'state': state, 'last_actual': month_start(grid[-1])})
+            
+            result["forecast"] = None
+            
+            if not fc.empty:
+                fc_grid, (predicted, lower, upper) = monthly_grid(
+                    fc['forecast_date'], fc['predicted_turnover'], fc['lower_bound'], fc['upper_bound']
+                )
+                result["forecast"] = {
+                    "start": str(month_start(fc_grid[0])),
+                    "offset": int((fc_grid[0] - grid[0]).astype(np.int64)),
+                    "count": len(predicted),
+                    "values": predicted,
+                    "lower": lower,
+                    "upper": upper
+                }
+        
+        return array_response(result)
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/states")
-def get_states():
-    """Get list of all Australian states/territories WITH proper names"""
+# ============================================================================
+# INSIGHT ENDPOINTS
+# ============================================================================
+
+@app.get("/insights/top-movers")
+async def get_top_movers(
+    n: int = Query(10, ge=1, le=100, description="Number of movers"),
+    metric: str = Query("yoy", pattern="^(yoy|mom|forecast_growth)$", description="yoy / mom growth, or forecast_growth over the next forecast months"),
+    scope: str = Query("category", pattern="^(category|state|series)$", description="Rank categories (national), states (all retail) or every category/state series"),
+    period: Optional[str] = Query(None, description="Month (YYYY-MM); default latest"),
+    direction: str = Query("up", pattern="^(up|down)$", description="'up' for fastest growing, 'down' for fastest falling")
+):
+    """
+    Get the fastest growing (or falling) categories, states or series
+    
+    Served from `series_rankings`, which the loader recomputes after each
+    data load and forecast run. yoy/mom rankings cover the last 24 months;
+    forecast_growth compares the forecast months after the latest actual
+    month (up to 12) with the same months a year earlier.
+    """
+    period_date = None
+    if period:
+        try:
+            period_date = date.fromisoformat(f"{period}-01")
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid period '{period}' (expected YYYY-MM)")
+    
     try:
-        query = """
-            SELECT DISTINCT 
-                rs.state as state_code,
-                COALESCE(sm.state_name, rs.state) as state_name,
-                COALESCE(sm.state_full_name, rs.state) as state_full_name
-            FROM retail_sales rs
-            LEFT JOIN state_mapping sm ON rs.state = sm.state_code
-            ORDER BY rs.state
-        """
+        try:
+            df = await read_sql(engine, f"""
+                SELECT 
+                    r.rank,
+                    r.period,
+                    r.category as category_code,
+                    r.state as state_code,
+                    r.value
+                FROM series_rankings r
+                WHERE r.metric = :metric
+                AND r.scope = :scope
+                AND r.period = COALESCE(
+                    CAST(:period AS DATE),
+                    (SELECT MAX(period) FROM series_rankings WHERE metric = :metric AND scope = :scope)
+                )
+                ORDER BY r.rank {"ASC" if direction == "up" else "DESC"}
+                LIMIT :n
+            """, {'metric': metric, 'scope': scope, 'period': period_date, 'n': n})
+        except ProgrammingError:
+            df = pd.DataFrame()
         
-        df = pd.read_sql(text(query), engine)
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No rankings found for this metric and period")
         
-        return {
+        df = (await get_dimensions()).decorate(df)
+        result_period = str(df['period'].iloc[0])[:7]
+        df = df.drop(columns='period')
+        
+        return json_response({
+            "metric": metric,
+            "scope": scope,
+            "period": result_period,
+            "direction": direction,
+            "unit": "percent",
             "count": len(df),
-            "states": df.to_dict(orient='records')
-        }
+            "movers": df.to_dict(orient='records')
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================================================
+# METADATA ENDPOINTS
+# ============================================================================
+
+@app.get("/categories")
+async def get_categories():
+    """Get list of all retail categories WITH proper names"""
+    try:
+        categories = (await get_dimensions()).categories()
+        
+        return json_response({
+            "count": len(categories),
+            "categories": categories
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/states")
+async def get_states():
+    """Get list of all Australian states/territories WITH proper names"""
+    try:
+        states = (await get_dimensions()).states()
         
+        return json_response({
+            "count": len(states),
+            "states": states
+        })
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,169 @@
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.routing import Match
+from contextvars import ContextVar
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = tuple(2 ** i for i in range(8, 27, 2))  # 256 B .. 64 MB
+
+REQUESTS = Counter(
+    'api_requests_total', 'HTTP requests handled', ['route', 'method', 'status']
+)
+LATENCY = Histogram(
+    'api_request_duration_seconds', 'End-to-end request latency', ['route'],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    'api_request_stage_seconds',
+    'Request time by stage: db (query + fetch), serialization (JSON encoding) '
+    'and processing (everything else, mostly DataFrame work)',
+    ['route', 'stage'],
+    buckets=LATENCY_BUCKETS
+)
+POOL_WAIT = Histogram(
+    'api_db_pool_checkout_seconds', 'Time waiting to check out a pooled DB connection', ['route'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+RESPONSE_SIZE = Histogram(
+    'api_response_size_bytes', 'Response body size on the wire', ['route'],
+    buckets=SIZE_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    'api_response_cache_total', 'Response cache lookups by result (hit/miss)', ['route', 'result']
+)
+IN_FLIGHT = Gauge(
+    'api_requests_in_flight', 'Requests currently being processed', ['route']
+)
+POOL_CHECKED_OUT = Gauge(
+    'api_db_pool_checked_out', 'DB connections currently checked out of the pool'
+)
+EVENT_SUBSCRIBERS = Gauge(
+    'api_event_subscribers', 'Open server-sent event (/events) connections'
+)
+ADMISSION_QUEUED = Gauge(
+    'api_admission_queued', 'Expensive requests waiting for a route concurrency slot', ['route']
+)
+STARTUP_SECONDS = Gauge(
+    'api_startup_seconds', 'Duration of each startup phase (imports, first query, warm-up)', ['phase']
+)
+ADMISSION_REJECTIONS = Counter(
+    'api_admission_rejections_total', 'Requests refused by admission control (full queue or wait timeout)',
+    ['route', 'reason']
+)
+
+# Per-request stage timings, filled in by read_sql and json_response
+_stage_timings = ContextVar('stage_timings', default=None)
+
+# Route template of the current request (for per-route DB settings and logs)
+_current_route = ContextVar('current_route', default=None)
+
+def current_route():
+    return _current_route.get()
+
+def add_stage_time(stage, seconds):
+    """Add time spent in a stage to the current request (no-op outside requests)"""
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+class timed_stage:
+    """Context manager recording the enclosed block as a request stage"""
+    
+    def __init__(self, stage):
+        self.stage = stage
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        add_stage_time(self.stage, time.perf_counter() - self.started)
+        return False
+
+def track_pool(engine):
+    """Expose the number of checked-out connections of an (async) engine"""
+    POOL_CHECKED_OUT.set_function(lambda: engine.sync_engine.pool.checkedout())
+
+def track_subscribers(broadcaster):
+    """Expose the number of connected event stream subscribers"""
+    EVENT_SUBSCRIBERS.set_function(lambda: len(broadcaster))
+
+def metrics_response():
+    """Prometheus text exposition of all API metrics"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+def resolve_route(scope):
+    """Route template for a request (e.g. '/sales'), keeping label cardinality low"""
+    app = scope.get('app')
+    routes = getattr(getattr(app, 'router', None), 'routes', [])
+    
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    
+    return partial or 'unmatched'
+
+class MetricsMiddleware:
+    """Record request count, latency by stage, size, cache result and in-flight per route"""
+    
+    def __init__(self, app, skip_paths=('/metrics',)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        route = resolve_route(scope)
+        timings = {}
+        token = _stage_timings.set(timings)
+        route_token = _current_route.set(route)
+        status = 500
+        size = 0
+        
+        async def send_wrapper(message):
+            nonlocal status, size
+            
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                cache_result = Headers(raw=message['headers']).get('x-cache')
+                if cache_result:
+                    CACHE_LOOKUPS.labels(route, cache_result.lower()).inc()
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            
+            await send(message)
+        
+        IN_FLIGHT.labels(route).inc()
+        started = time.perf_counter()
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.labels(route).dec()
+            _stage_timings.reset(token)
+            _current_route.reset(route_token)
+            
+            REQUESTS.labels(route, scope['method'], str(status)).inc()
+            LATENCY.labels(route).observe(elapsed)
+            RESPONSE_SIZE.labels(route).observe(size)
+            
+            pool_wait = timings.get('pool_wait', 0.0)
+            db = timings.get('db', 0.0)
+            serialization = timings.get('serialization', 0.0)
+            
+            if 'pool_wait' in timings:
+                POOL_WAIT.labels(route).observe(pool_wait)
+            STAGE_LATENCY.labels(route, 'db').observe(db)
+            STAGE_LATENCY.labels(route, 'serialization').observe(serialization)
+            STAGE_LATENCY.labels(route, 'processing').observe(
+                max(elapsed - pool_wait - db - serialization, 0.0)
+            )
@@ -0,0 +1,78 @@
+from sqlalchemy import text
+import asyncio
+import json
+import logging
+import os
+import re
+from datetime import datetime
+
+# Queries slower than this (milliseconds) are written to the slow-query log
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '1000'))
+
+# Also capture EXPLAIN (ANALYZE, BUFFERS) for slow queries. This runs the
+# query a second time, so it is off by default and one capture runs at a time.
+EXPLAIN_SLOW_QUERIES = os.getenv('SLOW_QUERY_EXPLAIN', '0') == '1'
+
+_logger = None
+_explaining = False
+
+def get_slow_query_logger():
+    """JSON-lines logger writing to SLOW_QUERY_LOG (rotated at 10 MB, 5 files kept)"""
+    global _logger
+    
+    if _logger is None:
+        # Imported on first use: most processes never log a slow query
+        from logging.handlers import RotatingFileHandler
+        
+        path = os.getenv('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        
+        handler = RotatingFileHandler(path, maxBytes=10 * 1024 * 1024, backupCount=5)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        
+        _logger = logging.getLogger('api.slow_queries')
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        _logger.addHandler(handler)
+    
+    return _logger
+
+def log_slow_query(engine, route, query, params, seconds, rows=None, error=None):
+    """Record a slow (or timed-out) query with its parameters"""
+    global _explaining
+    
+    record = {
+        "at": datetime.now().isoformat(timespec='seconds'),
+        "route": route,
+        "ms": round(seconds * 1000, 1),
+        "rows": rows,
+        "error": error,
+        "sql": re.sub(r"\s+", " ", query).strip(),
+        "params": params or {},
+    }
+    
+    if EXPLAIN_SLOW_QUERIES and error is None and not _explaining:
+        _explaining = True
+        asyncio.get_running_loop().create_task(_explain_and_log(engine, record, query, params))
+    else:
+        _write(record)
+
+async def _explain_and_log(engine, record, query, params):
+    global _explaining
+    
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params or {}
+            )
+            plan = result.scalar()
+        record["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as e:
+        record["plan_error"] = str(e)
+    finally:
+        _explaining = False
+    
+    _write(record)
+
+def _write(record):
+    get_slow_query_logger().info(json.dumps(record, default=str))
@@ -0,0 +1,62 @@
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from api.metrics import timed_stage
+
+def json_response(content):
+    """
+    Render JSON-ready content (plain dicts/lists/str/float/int/None)
+    
+    Skips FastAPI's recursive jsonable_encoder pass and records the
+    encoding time as the request's serialization stage.
+    """
+    with timed_stage('serialization'):
+        return JSONResponse(content)
+
+def array_response(content):
+    """
+    Render content holding NumPy arrays with orjson (NaN becomes null)
+    
+    Like json_response, but numeric arrays are encoded directly instead of
+    being converted to Python lists first.
+    """
+    with timed_stage('serialization'):
+        return ORJSONResponse(content)
+
+def columnar_response(df, dimensions, date_column):
+    """
+    Serialise a fact DataFrame as one array per column
+    
+    Category/state names are not repeated per row: they are returned once in
+    `lookups`, keyed by code. Numeric columns go to orjson as NumPy arrays
+    (NaN becomes null) so large pulls skip the per-row dict conversion.
+    """
+    columns = {}
+    
+    for name in df.columns:
+        values = df[name]
+        
+        if name == date_column:
+            columns[name] = values.astype(str).tolist()
+        elif values.dtype == object:
+            columns[name] = values.tolist()
+        else:
+            columns[name] = values.to_numpy()
+    
+    lookups = {}
+    
+    if 'category_code' in df.columns:
+        codes = df['category_code'].unique()
+        lookups['category_name'] = {code: dimensions.category_name(code) for code in codes}
+    
+    if 'state_code' in df.columns:
+        codes = df['state_code'].unique()
+        lookups['state_name'] = {code: dimensions.state_name(code) for code in codes}
+        lookups['state_full_name'] = {code: dimensions.state_full_name(code) for code in codes}
+    
+    with timed_stage('serialization'):
+        return ORJSONResponse({
+            "count": len(df),
+            "shape": "columnar",
+            "columns": columns,
+            "lookups": lookups
+        })
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+import os
+import time
+
+# Workers notice a new data version independently (see DataVersionTracker),
+# so responses of another version are only dropped once this old
+STALE_GRACE_SECONDS = 300
+
+def get_shared_cache():
+    """SharedCache at SHARED_CACHE_PATH, or None when the shared tier is disabled"""
+    path = os.getenv('SHARED_CACHE_PATH')
+    return SharedCache(path) if path else None
+
+class SharedCache:
+    """
+    Cache tier shared by all worker processes on one host, in a SQLite file
+    
+    Holds serialised responses (keyed by path and query plus data version,
+    so workers on either side of a rollover keep their own entries) and
+    named blobs such as the sales snapshot. Writing under a new data version
+    drops responses stored under other versions (after a short grace period
+    for workers still on the previous one). Each call opens its own short
+    connection, so it is safe from threads and processes; call it through
+    the threadpool from async code.
+    """
+    
+    def __init__(self, path, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.getenv('SHARED_CACHE_MB', '256')) * 1024 * 1024
+        )
+        
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            
+            # Files from before responses were keyed by (key, version): workers
+            # on either side of a version rollover overwrote each other's entries
+            key_columns = [row[1] for row in conn.execute("PRAGMA table_info(responses)") if row[5]]
+            if key_columns == ['key']:
+                conn.execute("DROP TABLE responses")
+            
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (key, version)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    name TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+    
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection; commits on success and always closes"""
+        import sqlite3  # only needed when the shared tier is enabled
+        
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def get_response(self, key, version):
+        """(body, content_type) stored under key for this version, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, content_type FROM responses WHERE key = ? AND version = ?",
+                (key, version)
+            ).fetchone()
+        return row
+    
+    def put_response(self, key, version, body, content_type):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM responses WHERE version != ? AND stored_at < ?",
+                (version, time.time() - STALE_GRACE_SECONDS)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, version, content_type, body, time.time())
+            )
+            self._evict(conn)
+    
+    def get_blob(self, name, version):
+        """Blob stored under name for this version, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM blobs WHERE name = ? AND version = ?", (name, version)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put_blob(self, name, version, data):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)", (name, version, data))
+    
+    def _evict(self, conn):
+        """Drop the oldest responses while the tier is over its size budget"""
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+        
+        if total > self.max_bytes:
+            for key, version, size in conn.execute(
+                "SELECT key, version, LENGTH(body) FROM responses ORDER BY stored_at"
+            ).fetchall():
+                conn.execute("DELETE FROM responses WHERE key = ? AND version = ?", (key, version))
+                total -= size
+                if total <= self.max_bytes:
+                    break
@@ -0,0 +1,259 @@
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import io
+import os
+import numpy as np
+import pandas as pd
+
+from api.db import read_sql
+
+MONTH_NAMES = np.array([
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+], dtype=object)
+
+EMPTY_ROWS = np.array([], dtype=np.int64)
+
+# Months in a complete period, for year/quarter yoy
+PERIOD_MONTHS = {'year': 12, 'quarter': 3}
+
+class SalesSnapshot:
+    """
+    Compact, immutable columnar copy of retail_sales
+    
+    Rows are sorted by (category, state, sale_date) so each series is one
+    contiguous slice, found through `series_index`. Category and state codes
+    are stored as small integer ids into `categories` / `states`; month_name
+    and year are derived from the date when rows are materialised. A second
+    permutation (`by_date`) orders every row by date for unfiltered ranges.
+    """
+    
+    def __init__(self, df, version):
+        df = df.sort_values(['category', 'state', 'sale_date'], kind='stable')
+        
+        category_ids, categories = pd.factorize(df['category'], sort=True)
+        state_ids, states = pd.factorize(df['state'], sort=True)
+        
+        self.version = version
+        self.categories = np.asarray(categories, dtype=object)
+        self.states = np.asarray(states, dtype=object)
+        self.category_lookup = {code: i for i, code in enumerate(self.categories)}
+        self.state_lookup = {code: i for i, code in enumerate(self.states)}
+        
+        self.category_ids = category_ids.astype(np.int16)
+        self.state_ids = state_ids.astype(np.int16)
+        self.dates = pd.to_datetime(df['sale_date']).to_numpy().astype('datetime64[D]')
+        self.months = self.dates.astype('datetime64[M]').astype(np.int32)  # months since 1970-01
+        self.turnover = pd.to_numeric(df['turnover_millions']).to_numpy(dtype=np.float64)
+        self.growth = pd.to_numeric(df['growth_rate_yoy']).to_numpy(dtype=np.float64)
+        
+        # Contiguous slice of every (category, state) series
+        keys = self.category_ids.astype(np.int32) * 1024 + self.state_ids
+        self.series_index = {}
+        if len(keys):
+            boundaries = np.flatnonzero(np.diff(keys)) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [len(keys)]))
+            for start, stop in zip(starts, stops):
+                key = (int(self.category_ids[start]), int(self.state_ids[start]))
+                self.series_index[key] = (int(start), int(stop))
+        
+        self.by_date = np.argsort(self.dates, kind='stable')
+        self.sorted_dates = self.dates[self.by_date]
+    
+    def to_bytes(self):
+        """Serialise the source columns (no pickled objects) for the shared cache tier"""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            category=self.categories[self.category_ids].astype(str),
+            state=self.states[self.state_ids].astype(str),
+            sale_date=self.dates,
+            turnover_millions=self.turnover,
+            growth_rate_yoy=self.growth
+        )
+        return buffer.getvalue()
+    
+    @classmethod
+    def from_bytes(cls, data, version):
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            df = pd.DataFrame({name: arrays[name] for name in arrays.files})
+        return cls(df, version)
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    @staticmethod
+    def _bounds(dates, start, end):
+        lo = np.searchsorted(dates, np.datetime64(start, 'D'), 'left') if start else 0
+        hi = np.searchsorted(dates, np.datetime64(end, 'D'), 'right') if end else len(dates)
+        return lo, hi
+    
+    def rows(self, category=None, state=None, start=None, end=None):
+        """Row positions matching the filters, in ascending date order"""
+        if not category and not state:
+            lo, hi = self._bounds(self.sorted_dates, start, end)
+            return self.by_date[lo:hi]
+        
+        category_id = self.category_lookup.get(category) if category else None
+        state_id = self.state_lookup.get(state) if state else None
+        
+        if (category and category_id is None) or (state and state_id is None):
+            return EMPTY_ROWS
+        
+        parts = []
+        for (c, s), (a, b) in self.series_index.items():
+            if (category_id is None or c == category_id) and (state_id is None or s == state_id):
+                lo, hi = self._bounds(self.dates[a:b], start, end)
+                parts.append(np.arange(a + lo, a + hi))
+        
+        if not parts:
+            return EMPTY_ROWS
+        
+        rows = np.concatenate(parts)
+        if len(parts) > 1:
+            rows = rows[np.argsort(self.dates[rows], kind='stable')]
+        return rows
+    
+    def frame(self, rows, columns):
+        """Materialise rows as a DataFrame with the requested /sales columns"""
+        builders = {
+            'sale_date': lambda: np.datetime_as_string(self.dates[rows], unit='D').astype(object),
+            'category_code': lambda: self.categories[self.category_ids[rows]],
+            'state_code': lambda: self.states[self.state_ids[rows]],
+            'turnover_millions': lambda: self.turnover[rows],
+            'month_name': lambda: MONTH_NAMES[self.months[rows] % 12],
+            'year': lambda: (self.months[rows] // 12 + 1970).astype(np.int64),
+            'growth_rate_yoy': lambda: self.growth[rows],
+        }
+        return pd.DataFrame({name: builders[name]() for name in columns if name in builders})
+    
+    def query(self, columns, category=None, state=None, start=None, end=None, limit=None):
+        """Equivalent of the /sales query: filtered rows, newest first"""
+        rows = self.rows(category, state, start, end)[::-1][:limit]
+        return self.frame(rows, columns)
+    
+    def aggregate(self, group_by, metric, category=None, state=None, start=None, end=None):
+        """Equivalent of the /sales/aggregate query (same columns and semantics)"""
+        rows = self.rows(category, state, start, end)
+        months = self.months[rows]
+        
+        frame = pd.DataFrame({
+            'year': months // 12 + 1970,
+            'quarter': (months % 12) // 3 + 1,
+            'state_code': self.states[self.state_ids[rows]],
+            'category_code': self.categories[self.category_ids[rows]],
+            'value': self.turnover[rows],
+        })
+        keys = {
+            'year': ['year'],
+            'quarter': ['year', 'quarter'],
+            'state': ['state_code'],
+            'category': ['category_code'],
+        }[group_by]
+        
+        if frame.empty:
+            return pd.DataFrame(columns=keys + ['value', 'records'])
+        
+        if metric in ('sum', 'avg'):
+            grouped = frame.groupby(keys, sort=True)['value']
+            result = grouped.agg(value='sum' if metric == 'sum' else 'mean', records='size')
+            if metric == 'sum':
+                # Source values have 4 decimals; drop float summation noise
+                result['value'] = result['value'].round(4)
+            return result.reset_index()
+        
+        if group_by in ('year', 'quarter'):
+            # Same period a year earlier; null unless both have all their months
+            frame['month'] = months
+            totals = frame.groupby(keys, sort=True).agg(
+                total=('value', 'sum'), records=('value', 'size'), months=('month', 'nunique')
+            ).reset_index()
+            earlier = totals[keys + ['total', 'months']].assign(year=totals['year'] + 1)
+            totals = totals.merge(earlier, on=keys, how='left', suffixes=('', '_earlier'))
+            
+            full = PERIOD_MONTHS[group_by]
+            complete = (totals['months'] == full) & (totals['months_earlier'] == full)
+            growth = (totals['total'] / totals['total_earlier'].replace(0, np.nan) - 1) * 100
+            totals['value'] = growth.where(complete).round(2)
+            return totals[keys + ['value', 'records']]
+        
+        # State/category growth: latest 12 months vs the 12 months before them
+        latest = months.max()
+        in_window = months > latest - 24
+        frame = frame[in_window].copy()
+        recent = months[in_window] > latest - 12
+        frame['current'] = np.where(recent, frame['value'], np.nan)
+        frame['previous'] = np.where(~recent, frame['value'], np.nan)
+        
+        grouped = frame.groupby(keys, sort=True)
+        totals = pd.DataFrame({
+            'current': grouped['current'].sum(min_count=1),
+            'previous': grouped['previous'].sum(min_count=1),
+            'records': grouped.size(),
+        }).reset_index()
+        totals['value'] = ((totals['current'] / totals['previous'].replace(0, np.nan) - 1) * 100).round(2)
+        return totals[keys + ['value', 'records']]
+
+class SnapshotStore:
+    """
+    Holds the current SalesSnapshot and swaps in a new one on data version change
+    
+    Enabled with SALES_SNAPSHOT=1. A reload builds the new snapshot completely
+    before replacing the reference, and concurrent callers for the same
+    version share one reload (a caller for a newer version starts its own).
+    With a `shared` cache tier, the first worker to load a version stores it
+    there and the other workers read it from disk instead of the database.
+    """
+    
+    def __init__(self, enabled=None, shared=None):
+        self.enabled = enabled if enabled is not None else os.getenv('SALES_SNAPSHOT', '0') == '1'
+        self.shared = shared
+        self.snapshot = None
+        self._loading = {}  # version -> in-flight load
+    
+    async def load(self, engine, version):
+        source = "database"
+        data = None
+        
+        if self.shared is not None:
+            data = await run_in_threadpool(self.shared.get_blob, 'sales_snapshot', str(version))
+        
+        if data is not None:
+            snapshot = await run_in_threadpool(SalesSnapshot.from_bytes, data, version)
+            source = "shared cache"
+        else:
+            df = await read_sql(engine, """
+                SELECT sale_date, category, state, turnover_millions, growth_rate_yoy
+                FROM retail_sales
+                ORDER BY category, state, sale_date
+            """)
+            snapshot = SalesSnapshot(df, version)
+            
+            if self.shared is not None:
+                await run_in_threadpool(
+                    self.shared.put_blob, 'sales_snapshot', str(version), snapshot.to_bytes()
+                )
+        
+        # A slower load of an older version must not replace a newer snapshot
+        if self.snapshot is None or self.snapshot.version <= version:
+            self.snapshot = snapshot
+        print(f"📦 Loaded sales snapshot from {source}: {len(snapshot):,} rows (data version {version})")
+        return snapshot
+    
+    async def get(self, engine, version):
+        """Snapshot for `version`, loading it first if needed (None when disabled)"""
+        if not self.enabled:
+            return None
+        
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        
+        loading = self._loading.get(version)
+        if loading is None:
+            loading = asyncio.ensure_future(self.load(engine, version))
+            self._loading[version] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(version, None))
+        
+        return await asyncio.shield(loading)
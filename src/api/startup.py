@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from sqlalchemy import text
+import asyncio
+import os
+import time
+
+from api.metrics import STARTUP_SECONDS
+
+class StartupProfile:
+    """
+    Timings of the phases between process start and a warm API
+    
+    `started` is taken at the top of main.py, before the heavy imports, so
+    the `imports` phase covers FastAPI, pandas and SQLAlchemy. Each phase is
+    printed as it finishes and exported as api_startup_seconds{phase}.
+    """
+    
+    def __init__(self, started):
+        self.started = started
+        self.phases = {}
+    
+    def record(self, phase, seconds):
+        self.phases[phase] = seconds
+        STARTUP_SECONDS.labels(phase).set(seconds)
+        print(f"⏱️  Startup: {phase} {seconds * 1000:,.0f} ms")
+    
+    def mark(self, phase):
+        """Record the time since `started` (the top of main.py)"""
+        self.record(phase, time.perf_counter() - self.started)
+    
+    @contextmanager
+    def stage(self, phase):
+        """Record how long the wrapped block takes"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+    
+    def report(self):
+        return {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()}
+
+async def asgi_get(app, path, headers=()):
+    """
+    GET `path` through the full ASGI stack in-process
+    
+    Used to prime the response cache exactly as a client request would
+    (same cache key, compressed variants). Returns the status code.
+    """
+    path, _, query = path.partition('?')
+    status = None
+    
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+    
+    await app({
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(name.encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 0),
+        'server': ('127.0.0.1', 80),
+    }, receive, send)
+    
+    return status
+
+async def open_connections(engine, count):
+    """Check out `count` pool connections at once so they are all opened"""
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(ping() for _ in range(count)))
+
+async def warm_up(app, engine, profile, prime=(), paths=()):
+    """
+    Background warm-up after startup (STARTUP_WARMUP=0 disables it)
+    
+    Opens the pool's connections, awaits each `prime` coroutine function
+    (dimension registry, data versions, ...) and requests `paths` so their
+    responses are cached. Requests arriving meanwhile are served normally
+    and share the work through the same caches. Failures are only logged.
+    """
+    try:
+        with profile.stage('first_query'):
+            await open_connections(engine, 1)
+        
+        with profile.stage('pool_open'):
+            await open_connections(engine, max(engine.pool.size() - 1, 0))
+        
+        for function in prime:
+            with profile.stage(function.__name__):
+                await function()
+        
+        headers = [('accept-encoding', 'br, gzip')]
+        with profile.stage('prime_responses'):
+            for path in paths:
+                status = await asgi_get(app, path, headers)
+                if status != 200:
+                    print(f"⚠️ Warm-up request {path} returned {status}")
+        
+        profile.mark('warm')
+    except Exception as e:
+        print(f"⚠️ Warm-up failed (requests will load on demand): {e}")
+
+def warmup_enabled():
+    return os.getenv('STARTUP_WARMUP', '1') == '1'
@@ -0,0 +1,252 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import argparse
+import json
+import random
+import subprocess
+import threading
+import time
+import numpy as np
+import requests
+
+from benchmark.seed import bench_database
+
+load_dotenv()
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def pick(codes, rng):
+    return rng.choice(codes)
+
+# Request mixes: (label, weight, request builder). Builders get the codes
+# present in the database and a random generator, and return (method, path, body).
+DASHBOARD_MIX = [
+    ('sales_summary', 3, lambda c, s, r: ('GET', '/sales/summary', None)),
+    ('forecast_summary', 2, lambda c, s, r: ('GET', '/forecasts/summary', None)),
+    ('categories', 2, lambda c, s, r: ('GET', '/categories', None)),
+    ('states', 2, lambda c, s, r: ('GET', '/states', None)),
+    ('series', 6, lambda c, s, r: ('GET', f"/series/{pick(c, r)}/{pick(s, r)}?forecast=true", None)),
+    ('top_movers', 2, lambda c, s, r: ('GET', f"/insights/top-movers?scope={r.choice(['category', 'state', 'series'])}", None)),
+    ('sales_recent', 4, lambda c, s, r: ('GET', f"/sales?category={pick(c, r)}&state={pick(s, r)}&start_date=2020-01-01&limit=100", None)),
+]
+
+ANALYST_MIX = [
+    ('sales_category', 3, lambda c, s, r: ('GET', f"/sales?category={pick(c, r)}&limit=5000&shape=columnar", None)),
+    ('sales_state_window', 2, lambda c, s, r: ('GET', f"/sales?state={pick(s, r)}&start_date=2022-01-01", None)),
+    ('aggregate_year', 3, lambda c, s, r: ('GET', f"/sales/aggregate?group_by=year&metric=sum&category={pick(c, r)}", None)),
+    ('aggregate_state_yoy', 1, lambda c, s, r: ('GET', '/sales/aggregate?group_by=state&metric=yoy', None)),
+    ('forecasts', 2, lambda c, s, r: ('GET', f"/forecasts?category={pick(c, r)}&state={pick(s, r)}", None)),
+    ('accuracy', 1, lambda c, s, r: ('GET', f"/accuracy?category={pick(c, r)}", None)),
+    ('series_batch', 2, lambda c, s, r: ('POST', '/series/batch', {
+        'series': [{'category': pick(c, r), 'state': pick(s, r)} for _ in range(10)]
+    })),
+]
+
+MIXES = {
+    'dashboard': DASHBOARD_MIX,
+    'analyst': ANALYST_MIX,
+    'mixed': DASHBOARD_MIX + ANALYST_MIX,
+}
+
+def process_rss(pid):
+    """Resident memory (bytes) of a process and its children (Linux /proc; None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (OSError, StopIteration):
+        return None
+    
+    # uvicorn --workers N: the workers are children of the supervisor
+    return rss + sum(process_rss(child) or 0 for child in children)
+
+class MemorySampler(threading.Thread):
+    """Samples the server's RSS until stopped; keeps the peak"""
+    
+    def __init__(self, pid, interval=0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, process_rss(self.pid) or 0)
+            time.sleep(self.interval)
+    
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.peak
+
+def start_server(database, port, workers, env_overrides):
+    """Boot src.api.main:app with uvicorn against the benchmark database"""
+    env = dict(os.environ, DB_NAME=database, **env_overrides)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'src.api.main:app',
+         '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers), '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=env
+    )
+    
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        try:
+            if requests.get(f"{base_url}/health", timeout=2).json().get('status') == 'healthy':
+                return server, base_url
+        except requests.RequestException:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.5)
+    
+    server.terminate()
+    raise RuntimeError("API did not become healthy")
+
+def run_phase(base_url, mix, codes, concurrency, seconds, seed_value=0):
+    """Drive a weighted request mix from `concurrency` clients; returns [(label, status, seconds)]"""
+    labels = [label for label, _, _ in mix]
+    weights = [weight for _, weight, _ in mix]
+    builders = {label: builder for label, _, builder in mix}
+    categories, states = codes
+    deadline = time.perf_counter() + seconds
+    
+    def client(index):
+        rng = random.Random(seed_value * 1000 + index)
+        session = requests.Session()
+        session.headers['Accept-Encoding'] = 'br, gzip'
+        samples = []
+        
+        while time.perf_counter() < deadline:
+            label = rng.choices(labels, weights)[0]
+            method, path, body = builders[label](categories, states, rng)
+            started = time.perf_counter()
+            try:
+                status = session.request(method, base_url + path, json=body, timeout=60).status_code
+            except requests.RequestException:
+                status = 0
+            samples.append((label, status, time.perf_counter() - started))
+        
+        return samples
+    
+    with ThreadPoolExecutor(concurrency) as pool:
+        return [sample for samples in pool.map(client, range(concurrency)) for sample in samples]
+
+def summarise(samples, seconds):
+    """Per-label count, error count, p50/p95/p99 (ms) and throughput (req/s)"""
+    stats = {}
+    for label in sorted({label for label, _, _ in samples}):
+        latencies = np.array([elapsed for l, _, elapsed in samples if l == label]) * 1000
+        statuses = [status for l, status, _ in samples if l == label]
+        stats[label] = {
+            'requests': len(latencies),
+            'errors': sum(1 for status in statuses if not 200 <= status < 300),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 1),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 1),
+            'rps': round(len(latencies) / seconds, 1),
+        }
+    return stats
+
+def print_table(title, stats, memory=None):
+    print(f"\n{title}")
+    print(f"   {'endpoint':<22}{'reqs':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'peak MB':>10}")
+    for label, row in stats.items():
+        peak = f"{memory[label] / 1024 / 1024:,.0f}" if memory and memory.get(label) else ""
+        print(f"   {label:<22}{row['requests']:>8,}{row['errors']:>8,}{row['p50_ms']:>10,.1f}"
+              f"{row['p95_ms']:>10,.1f}{row['p99_ms']:>10,.1f}{row['rps']:>9,.1f}{peak:>10}")
+
+def load_test(args):
+    """Benchmark the API against a seeded database (see benchmark/seed.py)"""
+    
+    database = bench_database(args.scale)
+    
+    print("="*70)
+    print(f"API LOAD TEST: {args.mix} mix, {args.concurrency} clients, {database}")
+    print("="*70)
+    
+    # Every layer that can answer without running the query: the in-process
+    # LRU, the shared SQLite tier and coalescing of concurrent requests
+    env_overrides = {
+        'RESPONSE_CACHE_MB': '0', 'SHARED_CACHE_PATH': '', 'RESPONSE_COALESCING': '0'
+    } if args.no_cache else {}
+    server, base_url = start_server(database, args.port, args.workers, env_overrides)
+    
+    try:
+        codes = (
+            [row['category_code'] for row in requests.get(f"{base_url}/categories").json()['categories']],
+            [row['state_code'] for row in requests.get(f"{base_url}/states").json()['states']],
+        )
+        mix = MIXES[args.mix]
+        idle_rss = process_rss(server.pid)
+        
+        # Warm-up pass (not recorded): pool connections, caches, snapshot
+        run_phase(base_url, mix, codes, args.concurrency, args.warmup)
+        
+        # Each endpoint alone, for its latency and peak memory in isolation
+        isolated, memory = {}, {}
+        if args.endpoint_seconds > 0:
+            for entry in mix:
+                sampler = MemorySampler(server.pid)
+                sampler.start()
+                samples = run_phase(base_url, [entry], codes, args.concurrency, args.endpoint_seconds)
+                memory[entry[0]] = sampler.stop()
+                isolated.update(summarise(samples, args.endpoint_seconds))
+        
+        # The whole mix, concurrently
+        sampler = MemorySampler(server.pid)
+        sampler.start()
+        samples = run_phase(base_url, mix, codes, args.concurrency, args.duration, seed_value=1)
+        mixed_peak = sampler.stop()
+        mixed = summarise(samples, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+    
+    if isolated:
+        print_table("⏱️  Endpoints in isolation:", isolated, memory)
+    print_table(f"⏱️  Concurrent {args.mix} mix ({args.duration}s):", mixed)
+    
+    total = len(samples)
+    errors = sum(row['errors'] for row in mixed.values())
+    print(f"\n📊 Throughput: {total / args.duration:,.1f} req/s ({total:,} requests, {errors:,} errors)")
+    if idle_rss:
+        print(f"💾 Server memory: {idle_rss / 1024 / 1024:,.0f} MB idle, {mixed_peak / 1024 / 1024:,.0f} MB peak under the mix")
+    
+    if args.json:
+        report = {
+            'database': database,
+            'scale': args.scale,
+            'mix': args.mix,
+            'concurrency': args.concurrency,
+            'workers': args.workers,
+            'cache': not args.no_cache,
+            'isolated': isolated,
+            'isolated_peak_rss': memory,
+            'mixed': mixed,
+            'mixed_peak_rss': mixed_peak,
+            'idle_rss': idle_rss,
+            'throughput_rps': round(total / args.duration, 1),
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the API against a seeded benchmark database")
+    parser.add_argument('--scale', type=int, default=1, help="Seeded scale to use (1, 10, 100)")
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent clients")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of the concurrent mix")
+    parser.add_argument('--endpoint-seconds', type=float, default=5, help="Seconds per endpoint in isolation (0 skips)")
+    parser.add_argument('--warmup', type=float, default=5, help="Unrecorded warm-up seconds")
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--no-cache', action='store_true', help="Disable the response cache, shared cache tier and request coalescing (measure the database path)")
+    parser.add_argument('--json', help="Also write the report to this JSON file")
+    load_test(parser.parse_args())
@@ -0,0 +1,209 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from dotenv import load_dotenv
+import argparse
+import io
+import math
+import time
+import numpy as np
+import pandas as pd
+
+from load.db_loader import create_sales_partitions, refresh_dataset_summary
+
+load_dotenv()
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Production size: 192 category/state series of ~499 months (95,798 rows)
+# and a 12-month forecast per series (2,304 rows)
+PRODUCTION_SERIES = 192
+SERIES_MONTHS = 499
+FORECAST_MONTHS = 12
+
+# Forecasts start this many months before the last actual, so /accuracy
+# has overlapping actuals to score (as after the next monthly release)
+FORECAST_OVERLAP = 6
+
+REAL_CATEGORIES = ['20'] + [str(i) for i in range(1, 16)]
+STATES = ['AUS', '1', '2', '3', '4', '5', '6', '7', '8']
+
+# Series generated and copied per batch (bounds memory at 100x)
+BATCH_SERIES = 500
+
+def bench_database(scale):
+    return f"{os.getenv('BENCH_DB_PREFIX', 'retail_bench')}_{scale}x"
+
+def bench_engine(database):
+    connection_string = (
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{database}"
+    )
+    return create_engine(connection_string, pool_pre_ping=True)
+
+def series_keys(scale):
+    """
+    Categories and (category, state) series for a scale
+    
+    Every category gets all states (as in production, so any category/state
+    pair a client picks exists): the real codes first, then synthetic ones.
+    """
+    n_categories = math.ceil(PRODUCTION_SERIES * scale / len(STATES))
+    categories = (REAL_CATEGORIES + [str(1000 + i) for i in range(n_categories)])[:n_categories]
+    return categories, [(category, state) for category in categories for state in STATES]
+
+def generate_batch(keys, dates, rng):
+    """Synthetic monthly turnover (seasonal random walks) for a batch of series"""
+    n_series, n_months = len(keys), len(dates)
+    
+    level = rng.uniform(5, 3000, size=(n_series, 1))
+    steps = rng.normal(0.004, 0.02, size=(n_series, n_months))
+    season = 1 + 0.08 * np.sin(2 * np.pi * (dates.month.to_numpy() - 3) / 12)
+    turnover = np.round(level * np.exp(np.cumsum(steps, axis=1)) * season, 2)
+    
+    growth = np.full_like(turnover, np.nan)
+    growth[:, 12:] = np.round((turnover[:, 12:] / turnover[:, :-12] - 1) * 100, 2)
+    
+    sales = pd.DataFrame({
+        'sale_date': np.tile(dates, n_series),
+        'category': np.repeat([c for c, _ in keys], n_months),
+        'state': np.repeat([s for _, s in keys], n_months),
+        'turnover_millions': turnover.ravel(),
+        'growth_rate_yoy': growth.ravel(),
+    })
+    
+    # Forecast: continue each series' trend from FORECAST_OVERLAP months back
+    anchor = turnover[:, -FORECAST_OVERLAP - 1:-FORECAST_OVERLAP]
+    path = anchor * np.cumprod(1 + rng.normal(0.003, 0.01, size=(n_series, FORECAST_MONTHS)), axis=1)
+    forecast_dates = pd.date_range(dates[-FORECAST_OVERLAP], periods=FORECAST_MONTHS, freq='MS')
+    
+    forecasts = pd.DataFrame({
+        'forecast_date': np.tile(forecast_dates, n_series),
+        'category': np.repeat([c for c, _ in keys], FORECAST_MONTHS),
+        'state': np.repeat([s for _, s in keys], FORECAST_MONTHS),
+        'predicted_turnover': np.round(path, 2).ravel(),
+        'lower_bound': np.round(path * 0.95, 2).ravel(),
+        'upper_bound': np.round(path * 1.05, 2).ravel(),
+        'confidence_interval': 0.95,
+        'model_name': 'Prophet',
+        'model_version': 'benchmark',
+    })
+    
+    return sales, forecasts
+
+def copy_frame(engine, table, df):
+    """COPY a DataFrame into a table (much faster than INSERTs at 10x/100x)"""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+                buffer
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+def create_database(database):
+    """Create the benchmark database if missing (it is dropped and reseeded, never shared)"""
+    admin = bench_engine('postgres').execution_options(isolation_level='AUTOCOMMIT')
+    with admin.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {'name': database}
+        ).scalar()
+        if not exists:
+            conn.execute(text(f'CREATE DATABASE "{database}"'))
+    admin.dispose()
+
+def create_schema(engine, categories):
+    """Fresh tables from docs/database_schema.sql, with the mapping rows; returns their keys"""
+    with open(os.path.join(ROOT_DIR, 'docs', 'database_schema.sql')) as f:
+        statements = [s.strip() for s in f.read().split(';') if s.strip()]
+    
+    # The benchmark database is never shared, so start from an empty schema
+    # (retail_sales may be a table or the compact layout's view)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        for statement in statements:
+            conn.execute(text(statement))
+    
+    names = ['Total', 'NSW', 'VIC', 'QLD', 'SA', 'WA', 'TAS', 'NT', 'ACT']
+    pd.DataFrame({
+        'state_code': STATES,
+        'state_name': names,
+        'state_full_name': names,
+    }).to_sql('state_mapping', engine, if_exists='append', index=False)
+    
+    pd.DataFrame({
+        'category_code': categories,
+        'category_name': [f"Category {code}" for code in categories],
+    }).to_sql('category_mapping', engine, if_exists='append', index=False)
+    
+    with engine.connect() as conn:
+        category_ids = dict(conn.execute(text("SELECT category_code, category_id FROM category_mapping")).fetchall())
+        state_ids = dict(conn.execute(text("SELECT state_code, state_id FROM state_mapping")).fetchall())
+    return category_ids, state_ids
+
+def seed(scale, seed_value=0):
+    """Create and fill the benchmark database for one scale (1, 10 or 100)"""
+    
+    database = bench_database(scale)
+    
+    print("="*70)
+    print(f"SEEDING BENCHMARK DATABASE {database} ({scale}x production)")
+    print("="*70)
+    
+    started = time.time()
+    create_database(database)
+    engine = bench_engine(database)
+    
+    categories, keys = series_keys(scale)
+    category_ids, state_ids = create_schema(engine, categories)
+    
+    dates = pd.date_range(end='2024-12-01', periods=SERIES_MONTHS, freq='MS')
+    rng = np.random.default_rng(seed_value)
+    
+    with engine.begin() as conn:
+        create_sales_partitions(conn, dates[0].year, dates[-1].year)
+    
+    for start in range(0, len(keys), BATCH_SERIES):
+        batch = keys[start:start + BATCH_SERIES]
+        sales, forecasts = generate_batch(batch, dates, rng)
+        copy_frame(engine, 'sales_facts', pd.DataFrame({
+            'category_id': sales['category'].map(category_ids),
+            'state_id': sales['state'].map(state_ids),
+            'sale_date': sales['sale_date'],
+            'turnover_millions': sales['turnover_millions'],
+            'growth_rate_yoy': sales['growth_rate_yoy'],
+        }).sort_values('sale_date', kind='stable'))
+        copy_frame(engine, 'sales_forecasts', forecasts)
+        print(f"   Series {start + len(batch):,}/{len(keys):,}")
+    
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE sales_facts"))
+        conn.execute(text("ANALYZE sales_forecasts"))
+        conn.commit()
+    
+    refresh_dataset_summary(engine, 'retail_sales')
+    refresh_dataset_summary(engine, 'sales_forecasts')
+    
+    print(f"\n✅ Seeded {len(keys) * SERIES_MONTHS:,} sales rows and "
+          f"{len(keys) * FORECAST_MONTHS:,} forecasts in {time.time() - started:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a local Postgres benchmark database")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help="Multiples of production size, e.g. 1 10 100")
+    args = parser.parse_args()
+    
+    if os.getenv('DB_HOST') not in ('localhost', '127.0.0.1', 'postgres', 'db'):
+        sys.exit("❌ Benchmark seeding drops tables: point DB_HOST at a local Postgres (e.g. a docker container)")
+    
+    for scale in args.scale:
+        seed(scale)
@@ -1,8 +1,38 @@
 import requests
 import pandas as pd
 from datetime import datetime
+from io import StringIO
 import time
 
+# Columns the transformer needs (plus the series filter keys), read as text
+# except the value, so pandas never infers types over the whole payload
+RAW_COLUMNS = ['TIME_PERIOD', 'OBS_VALUE', 'MEASURE', 'INDUSTRY', 'REGION', 'TSEST']
+RAW_DTYPES = {
+    'TIME_PERIOD': str,
+    'OBS_VALUE': 'float64',
+    'MEASURE': str,
+    'INDUSTRY': str,
+    'REGION': str,
+    'TSEST': str,
+}
+
+# Rows parsed per chunk while streaming; about two thirds are filtered out
+CHUNK_ROWS = 50000
+
+def keep_original_series(chunk):
+    """
+    M1 + TSEST 20 rows of a raw chunk (original, unadjusted series)
+    
+    ABS returns multiple MEASURE types (M1, M4, etc.) and multiple TSEST
+    types within each measure (10, 20, 30, etc.). We only want M1 + TSEST
+    20 to get ONE clean record per date/category/state.
+    """
+    if 'MEASURE' in chunk.columns and 'TSEST' in chunk.columns:
+        return chunk[(chunk['MEASURE'] == 'M1') & (chunk['TSEST'] == '20')]
+    if 'MEASURE' in chunk.columns:
+        return chunk[chunk['MEASURE'] == 'M1']
+    return chunk
+
 class ABSRetailDataExtractor:
     """
     Extract retail sales data from Australian Bureau of Statistics API
@@ -77,13 +107,16 @@ class ABSRetailDataExtractor:
             print(f"❌ Error exploring data: {str(e)}")
             return None
     
-    def extract_retail_sales(self, start_date=None, end_date=None):
+    def extract_retail_sales(self, start_date=None, end_date=None, stream=True):
         """
         Extract retail sales data for specified date range
         
         Parameters:
         - start_date: str (format: 'YYYY-MM') or None for all available
         - end_date: str (format: 'YYYY-MM') or None for all available
+        - stream: parse the response in CHUNK_ROWS chunks as it downloads,
+          filtering each chunk, so peak memory follows the kept rows rather
+          than the raw payload (False buffers the whole response first)
         """
         print("\n" + "="*60)
         print("EXTRACTING AUSTRALIAN RETAIL SALES DATA")
@@ -100,42 +133,48 @@ class ABSRetailDataExtractor:
             
             print(f"\nFetching data from {params['startPeriod']} to {params['endPeriod']}...")
             
-            response = requests.get(url, params=params, timeout=60)
-            
-            if response.status_code == 200:
-                from io import StringIO
-                df = pd.read_csv(StringIO(response.text))
+            with requests.get(url, params=params, timeout=60, stream=stream) as response:
+                if response.status_code != 200:
+                    print(f"❌ API Error: {response.status_code}")
+                    return None
                 
-                print(f"✅ Retrieved {len(df):,} raw records")
-                
-                # 🔧 CRITICAL FIX: Filter to M1 AND TSEST 20 (original, unadjusted series)
-                # ABS returns:
-                # - Multiple MEASURE types (M1, M4, etc.)
-                # - Multiple TSEST types within each measure (10, 20, 30, etc.)
-                # We only want M1 + TSEST 20 to get ONE clean record per date/category/state
-                if 'MEASURE' in df.columns and 'TSEST' in df.columns:
-                    before_filter = len(df)
-                    df = df[(df['MEASURE'] == 'M1') & (df['TSEST'] == 20)].copy()
-                    after_filter = len(df)
-                    removed = before_filter - after_filter
-                    print(f"✅ Filtered to M1 + TSEST 20 (original): {after_filter:,} records")
-                    print(f"   Removed {removed:,} duplicate series")
-                elif 'MEASURE' in df.columns:
-                    before_filter = len(df)
-                    df = df[df['MEASURE'] == 'M1'].copy()
-                    after_filter = len(df)
-                    removed = before_filter - after_filter
-                    print(f"✅ Filtered to M1 measure: {after_filter:,} records")
-                    print(f"   Removed {removed:,} duplicate series")
-                    print(f"   ⚠️ Warning: TSEST column not found - may still have duplicates")
+                if stream:
+                    # Undo gzip/deflate transfer encoding while reading the raw socket
+                    response.raw.decode_content = True
+                    source = response.raw
                 else:
-                    print("⚠️ Warning: MEASURE column not found - data may contain duplicates")
+                    source = StringIO(response.text)
                 
-                return df
+                raw_records = 0
+                chunks = []
+                columns = []
+                for chunk in pd.read_csv(
+                    source,
+                    usecols=lambda column: column in RAW_COLUMNS,
+                    dtype=RAW_DTYPES,
+                    chunksize=CHUNK_ROWS
+                ):
+                    raw_records += len(chunk)
+                    columns = chunk.columns
+                    chunks.append(keep_original_series(chunk))
+            
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=RAW_COLUMNS)
+            removed = raw_records - len(df)
+            
+            print(f"✅ Retrieved {raw_records:,} raw records")
+            
+            if 'MEASURE' in columns and 'TSEST' in columns:
+                print(f"✅ Filtered to M1 + TSEST 20 (original): {len(df):,} records")
+                print(f"   Removed {removed:,} duplicate series")
+            elif 'MEASURE' in columns:
+                print(f"✅ Filtered to M1 measure: {len(df):,} records")
+                print(f"   Removed {removed:,} duplicate series")
+                print(f"   ⚠️ Warning: TSEST column not found - may still have duplicates")
             else:
-                print(f"❌ API Error: {response.status_code}")
-                return None
-                
+                print("⚠️ Warning: MEASURE column not found - data may contain duplicates")
+            
+            return df
+        
         except Exception as e:
             print(f"❌ Extraction failed: {str(e)}")
             return None
@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from forecast.prophet_forecaster import RetailForecaster
+from load.db_loader import refresh_dataset_summary
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import pandas as pd
@@ -144,6 +145,9 @@ def forecast_all_categories():
         total_forecasts = result.fetchone()[0]
     
     print(f"\n📊 Total forecast records in database: {total_forecasts:,}")
+    
+    # Publish the new run's summary for the API
+    refresh_dataset_summary(engine, 'sales_forecasts')
 
 if __name__ == "__main__":
     forecast_all_categories()
\ No newline at end of file
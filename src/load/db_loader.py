@@ -1,11 +1,612 @@
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
 
 load_dotenv()
 
+# Source table, date column and value column summarised for each dataset
+SUMMARY_SOURCES = {
+    'retail_sales': ('retail_sales', 'sale_date', 'turnover_millions'),
+    'sales_forecasts': ('sales_forecasts', 'forecast_date', 'predicted_turnover'),
+}
+
+# ABS codes of the national total category and state
+TOTAL_CATEGORY = '20'
+TOTAL_STATE = 'AUS'
+
+# Months of history kept in series_rankings (yoy/mom)
+RANKING_MONTHS = 24
+
+# Composite indexes for the API's access path: filter on category and
+# state, order by date. The INCLUDE columns let series reads (/series,
+# /series/batch, /accuracy, the sales snapshot) run as index-only scans.
+SERIES_INDEXES = {
+    'idx_sales_series': """
+        retail_sales (category, state, sale_date)
+        INCLUDE (turnover_millions, growth_rate_yoy)
+    """,
+    'idx_forecast_series': """
+        sales_forecasts (category, state, forecast_date)
+        INCLUDE (predicted_turnover, lower_bound, upper_bound)
+    """,
+}
+
+# Single-column indexes made redundant by a SERIES_INDEXES prefix
+REDUNDANT_INDEXES = ('idx_category', 'idx_forecast_category')
+
+# Compact sales layout (see create_compact_sales): smallint dimension keys,
+# no derived columns, and a retail_sales view with the original columns so
+# readers are unchanged. The primary key is the API's series access path.
+# sales_facts is partitioned by year (see create_sales_partitions): date
+# windows prune to the years they cover and a year reloads as a partition
+# swap. Rows arrive in date order, so a BRIN index is enough for sale_date.
+COMPACT_SALES_DDL = [
+    """
+    CREATE TABLE sales_facts (
+        category_id SMALLINT NOT NULL,
+        state_id SMALLINT NOT NULL,
+        sale_date DATE NOT NULL,
+        turnover_millions NUMERIC(20, 4),
+        growth_rate_yoy NUMERIC(10, 2),
+        PRIMARY KEY (category_id, state_id, sale_date)
+    ) PARTITION BY RANGE (sale_date)
+    """,
+    "CREATE INDEX idx_facts_sale_date ON sales_facts USING brin (sale_date) WITH (pages_per_range = 16)",
+    "CREATE INDEX idx_facts_state ON sales_facts(state_id, sale_date)",
+    """
+    CREATE VIEW retail_sales AS
+    SELECT 
+        f.sale_date,
+        c.category_code as category,
+        s.state_code as state,
+        f.turnover_millions,
+        TO_CHAR(f.sale_date, 'FMMonth') as month_name,
+        EXTRACT(YEAR FROM f.sale_date)::INTEGER as year,
+        f.growth_rate_yoy
+    FROM sales_facts f
+    JOIN category_mapping c ON c.category_id = f.category_id
+    JOIN state_mapping s ON s.state_id = f.state_id
+    """,
+]
+
+
+def compute_rankings(sales, forecasts, months=RANKING_MONTHS):
+    """
+    Rank series by growth for /insights/top-movers, in one vectorised pass
+    
+    sales: sale_date, category, state, turnover_millions
+    forecasts: forecast_date, category, state, predicted_turnover
+    
+    Returns one row per (metric, scope, period, series) with its value (%)
+    and rank (1 = fastest growing) within the scope:
+    - yoy / mom: growth over 12 months / 1 month, for each recent month
+    - forecast_growth: the forecast months after the last actual month (up
+      to 12) vs the same calendar months a year earlier, at the last actual
+      month. Series missing any of those earlier actuals are left out, so
+      forecasts overlapping the actuals or shorter than 12 months still
+      compare like with like
+    Scopes: 'category' (national, state AUS), 'state' (all retail, category
+    20) and 'series' (every category/state pair, excluding totals).
+    """
+    sales = sales.assign(sale_date=pd.to_datetime(sales['sale_date']))
+    wide = sales.pivot_table(
+        index='sale_date', columns=['category', 'state'], values='turnover_millions', aggfunc='sum'
+    )
+    wide = wide.reindex(pd.date_range(wide.index.min(), wide.index.max(), freq='MS'))
+    wide = wide.astype(float)
+    
+    growth = {
+        'yoy': (wide / wide.shift(12) - 1) * 100,
+        'mom': (wide / wide.shift(1) - 1) * 100,
+    }
+    
+    frames = []
+    for metric, values in growth.items():
+        recent = values.iloc[-months:].rename_axis('period')
+        long = recent.stack(['category', 'state'], future_stack=True).rename('value').reset_index()
+        frames.append(long.assign(metric=metric))
+    
+    if forecasts is not None and not forecasts.empty:
+        last_actual = wide.index.max()
+        fc = forecasts.assign(forecast_date=pd.to_datetime(forecasts['forecast_date']))
+        fc = fc[(fc['forecast_date'] > last_actual) & (fc['forecast_date'] <= last_actual + pd.DateOffset(months=12))]
+        
+        # One prediction per series and month (several model versions may be stored)
+        fc = fc.groupby(['category', 'state', 'forecast_date'], as_index=False)['predicted_turnover'].mean()
+        
+        actuals = wide.stack(['category', 'state'], future_stack=True)
+        earlier = pd.MultiIndex.from_arrays([
+            fc['forecast_date'] - pd.DateOffset(years=1), fc['category'], fc['state']
+        ])
+        fc['earlier'] = actuals.reindex(earlier).to_numpy()
+        
+        totals = fc.groupby(['category', 'state']).agg(
+            forecast=('predicted_turnover', 'sum'),
+            earlier=('earlier', 'sum'),
+            months=('forecast_date', 'size'),
+            known=('earlier', 'count'),
+        )
+        totals = totals[totals['known'] == totals['months']]
+        
+        value = ((totals['forecast'].astype(float) / totals['earlier'] - 1) * 100).rename('value').reset_index()
+        frames.append(value.assign(metric='forecast_growth', period=last_actual))
+    
+    rankings = pd.concat(frames, ignore_index=True)
+    rankings = rankings[np.isfinite(rankings['value'])]
+    
+    is_total_category = rankings['category'] == TOTAL_CATEGORY
+    is_total_state = rankings['state'] == TOTAL_STATE
+    rankings['scope'] = np.select(
+        [is_total_state & ~is_total_category, is_total_category & ~is_total_state, ~is_total_category & ~is_total_state],
+        ['category', 'state', 'series'],
+        default=None
+    )
+    rankings = rankings[rankings['scope'].notna()].copy()
+    
+    rankings['rank'] = rankings.groupby(['metric', 'scope', 'period'])['value'].rank(
+        ascending=False, method='first'
+    ).astype(int)
+    rankings['period'] = rankings['period'].dt.date
+    rankings['value'] = rankings['value'].round(4)
+    
+    return rankings[['metric', 'scope', 'period', 'rank', 'category', 'state', 'value']]
+
+
+def refresh_rankings(engine):
+    """Recompute series_rankings from retail_sales and sales_forecasts (replaces all rows)"""
+    sales = pd.read_sql("SELECT sale_date, category, state, turnover_millions FROM retail_sales", engine)
+    
+    if sales.empty:
+        return
+    
+    forecasts = pd.read_sql(
+        "SELECT forecast_date, category, state, predicted_turnover FROM sales_forecasts", engine
+    )
+    rankings = compute_rankings(sales, forecasts)
+    
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS series_rankings (
+                metric VARCHAR(20) NOT NULL,
+                scope VARCHAR(20) NOT NULL,
+                period DATE NOT NULL,
+                rank INTEGER NOT NULL,
+                category VARCHAR(200) NOT NULL,
+                state VARCHAR(50) NOT NULL,
+                value DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (metric, scope, period, rank)
+            )
+        """))
+        conn.execute(text("DELETE FROM series_rankings"))
+        rankings.to_sql('series_rankings', conn, if_exists='append', index=False, method='multi', chunksize=5000)
+    
+    print(f"🏆 Refreshed series rankings ({len(rankings):,} rows)")
+
+
+def refresh_dataset_summary(engine, dataset):
+    """
+    Recompute the one-row summary for a dataset in dataset_summary
+    
+    The API serves /sales/summary and /forecasts/summary from this table,
+    so it must be refreshed at the end of every load or forecast run.
+    Each refresh bumps data_version for the dataset. Derived tables
+    (series_rankings) are rebuilt first, so they are in place before the
+    API sees the new version.
+    """
+    table, date_col, value_col = SUMMARY_SOURCES[dataset]
+    
+    try:
+        refresh_rankings(engine)
+    except Exception as e:
+        print(f"⚠️ Could not refresh series rankings: {e}")
+    
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS dataset_summary (
+                dataset VARCHAR(50) PRIMARY KEY,
+                total_records INTEGER NOT NULL,
+                categories INTEGER NOT NULL,
+                states INTEGER NOT NULL,
+                earliest_date DATE,
+                latest_date DATE,
+                avg_value DOUBLE PRECISION,
+                min_value DOUBLE PRECISION,
+                max_value DOUBLE PRECISION,
+                data_version INTEGER NOT NULL DEFAULT 1,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text(f"""
+            INSERT INTO dataset_summary (
+                dataset, total_records, categories, states,
+                earliest_date, latest_date, avg_value, min_value, max_value,
+                data_version, refreshed_at
+            )
+            SELECT 
+                :dataset,
+                COUNT(*),
+                COUNT(DISTINCT category),
+                COUNT(DISTINCT state),
+                MIN({date_col}),
+                MAX({date_col}),
+                AVG({value_col}),
+                MIN({value_col}),
+                MAX({value_col}),
+                1,
+                CURRENT_TIMESTAMP
+            FROM {table}
+            ON CONFLICT (dataset) DO UPDATE SET
+                total_records = EXCLUDED.total_records,
+                categories = EXCLUDED.categories,
+                states = EXCLUDED.states,
+                earliest_date = EXCLUDED.earliest_date,
+                latest_date = EXCLUDED.latest_date,
+                avg_value = EXCLUDED.avg_value,
+                min_value = EXCLUDED.min_value,
+                max_value = EXCLUDED.max_value,
+                data_version = dataset_summary.data_version + 1,
+                refreshed_at = EXCLUDED.refreshed_at
+        """), {'dataset': dataset})
+        conn.commit()
+    
+    print(f"📊 Refreshed {dataset} summary")
+
+
+def create_change_log(engine, reset=False):
+    """
+    Create retail_sales_changes and the triggers that fill it
+    
+    Every INSERT/UPDATE/DELETE on retail_sales is logged per row, stamped
+    with the data version the running load will publish (the current
+    retail_sales data_version + 1), so GET /sales/changes can return the
+    rows that changed between two versions. An 'R' (reset) row marks a
+    version before which changes are unknown: written when the log is first
+    created, on TRUNCATE, and with reset=True after the table is rebuilt.
+    With the compact layout the triggers are on sales_facts and log codes
+    looked up from the mapping tables. Safe to re-run.
+    """
+    with engine.begin() as conn:
+        if has_compact_sales(conn):
+            table = 'sales_facts'
+            columns = "r.sale_date, c.category_code, s.state_code, r.turnover_millions, r.growth_rate_yoy"
+            source = """{rows} r
+                    JOIN category_mapping c ON c.category_id = r.category_id
+                    JOIN state_mapping s ON s.state_id = r.state_id"""
+        else:
+            table = 'retail_sales'
+            columns = "sale_date, category, state, turnover_millions, growth_rate_yoy"
+            source = "{rows}"
+        
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS retail_sales_changes (
+                change_id BIGSERIAL PRIMARY KEY,
+                data_version INTEGER NOT NULL,
+                op CHAR(1) NOT NULL,
+                sale_date DATE,
+                category VARCHAR(200),
+                state VARCHAR(50),
+                turnover_millions NUMERIC(20, 4),
+                growth_rate_yoy NUMERIC(10, 2),
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_changes_version ON retail_sales_changes(data_version)"
+        ))
+        
+        # Statement-level triggers with transition tables: one INSERT ... SELECT
+        # per statement instead of one per row
+        conn.execute(text(f"""
+            CREATE OR REPLACE FUNCTION log_retail_sales_changes() RETURNS trigger AS $$
+            DECLARE
+                pending INTEGER;
+            BEGIN
+                IF to_regclass('dataset_summary') IS NOT NULL THEN
+                    SELECT data_version INTO pending
+                    FROM dataset_summary WHERE dataset = 'retail_sales';
+                END IF;
+                pending := COALESCE(pending, 0) + 1;
+                
+                IF TG_OP = 'INSERT' OR TG_OP = 'UPDATE' THEN
+                    INSERT INTO retail_sales_changes (
+                        data_version, op, sale_date, category, state, turnover_millions, growth_rate_yoy
+                    )
+                    SELECT pending, LEFT(TG_OP, 1), {columns}
+                    FROM {source.format(rows='new_rows')};
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO retail_sales_changes (
+                        data_version, op, sale_date, category, state, turnover_millions, growth_rate_yoy
+                    )
+                    SELECT pending, 'D', {columns}
+                    FROM {source.format(rows='old_rows')};
+                ELSE
+                    INSERT INTO retail_sales_changes (data_version, op) VALUES (pending, 'R');
+                END IF;
+                
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        
+        triggers = {
+            'retail_sales_log_insert': f"AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT",
+            'retail_sales_log_update': f"AFTER UPDATE ON {table} REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT",
+            'retail_sales_log_delete': f"AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT",
+            'retail_sales_log_truncate': f"AFTER TRUNCATE ON {table} FOR EACH STATEMENT",
+        }
+        for name, definition in triggers.items():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+            conn.execute(text(
+                f"CREATE TRIGGER {name} {definition} EXECUTE FUNCTION log_retail_sales_changes()"
+            ))
+        
+        # Reset marker: at the published version for a new log over existing
+        # data, or at the next version after a rebuild (old rows are gone)
+        published = 0
+        if conn.execute(text("SELECT to_regclass('dataset_summary') IS NOT NULL")).scalar():
+            published = conn.execute(text("""
+                SELECT COALESCE(MAX(data_version), 0) FROM dataset_summary WHERE dataset = 'retail_sales'
+            """)).scalar()
+        
+        is_new = conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM retail_sales_changes)")).scalar()
+        
+        if reset or is_new:
+            conn.execute(
+                text("INSERT INTO retail_sales_changes (data_version, op) VALUES (:version, 'R')"),
+                {'version': published + 1 if reset else published}
+            )
+    
+    print("📝 retail_sales change log ready")
+
+
+def create_series_indexes(engine, concurrently=True):
+    """
+    Create SERIES_INDEXES and drop the single-column indexes they replace
+    
+    With concurrently=True (for live tables) the indexes are built without
+    blocking writes; this can't run inside a transaction, so each statement
+    runs in autocommit mode. With the compact layout retail_sales is a view
+    and the sales_facts primary key already is its series index, so only the
+    forecast index is built. Safe to re-run.
+    """
+    mode = "CONCURRENTLY " if concurrently else ""
+    
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        compact = has_compact_sales(conn)
+        indexes = {
+            name: definition for name, definition in SERIES_INDEXES.items()
+            if not (compact and definition.strip().startswith('retail_sales'))
+        }
+        
+        for name, definition in indexes.items():
+            conn.execute(text(f"CREATE INDEX {mode}IF NOT EXISTS {name} ON {definition}"))
+        
+        for name in REDUNDANT_INDEXES:
+            conn.execute(text(f"DROP INDEX {mode}IF EXISTS {name}"))
+        
+        conn.execute(text("ANALYZE sales_facts" if compact else "ANALYZE retail_sales"))
+        conn.execute(text("ANALYZE sales_forecasts"))
+    
+    print(f"🗂️ Series indexes ready ({', '.join(indexes)})")
+
+
+def has_compact_sales(conn):
+    """True once retail_sales is the view over sales_facts (see create_compact_sales)"""
+    return conn.execute(text("SELECT to_regclass('sales_facts') IS NOT NULL")).scalar()
+
+
+def sales_partition(year):
+    return f"sales_facts_y{year}"
+
+
+def create_sales_partitions(conn, first_year, last_year):
+    """Create the missing yearly partitions of sales_facts for first_year..last_year"""
+    partitioned = conn.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('sales_facts')"
+    )).scalar()
+    if not partitioned or first_year is None:
+        return
+    
+    for year in range(int(first_year), int(last_year) + 1):
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {sales_partition(year)} PARTITION OF sales_facts
+            FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+        """))
+
+
+def staged_years(conn, source):
+    """(first, last) year of the rows in a table, or (None, None) when empty"""
+    return conn.execute(text(
+        f"SELECT EXTRACT(YEAR FROM MIN(sale_date))::int, EXTRACT(YEAR FROM MAX(sale_date))::int FROM {source}"
+    )).one()
+
+
+def create_dimension_keys(conn):
+    """Add smallint surrogate keys to the mapping tables (existing rows are numbered)"""
+    for table, key in (('category_mapping', 'category_id'), ('state_mapping', 'state_id')):
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {key} SMALLINT GENERATED BY DEFAULT AS IDENTITY"
+        ))
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{key} ON {table}({key})"))
+
+
+def register_codes(conn, source):
+    """Give codes in `source` (category, state columns) without a mapping row a key"""
+    conn.execute(text(f"""
+        INSERT INTO category_mapping (category_code, category_name)
+        SELECT DISTINCT category, category FROM {source} WHERE category IS NOT NULL
+        ON CONFLICT (category_code) DO NOTHING
+    """))
+    conn.execute(text(f"""
+        INSERT INTO state_mapping (state_code, state_name, state_full_name)
+        SELECT DISTINCT state, state, state FROM {source} WHERE state IS NOT NULL
+        ON CONFLICT (state_code) DO NOTHING
+    """))
+
+
+def stage_sales(conn, df, batch_size=5000):
+    """
+    Stage extract rows in a temp table, keyed for the current layout
+    
+    Returns the staging table name: retail_sales_staging (codes) for the
+    legacy table, facts_staging (dimension keys) for the compact layout.
+    """
+    conn.execute(text("""
+        CREATE TEMP TABLE retail_sales_staging (
+            sale_date DATE,
+            category VARCHAR(200),
+            state VARCHAR(50),
+            turnover_millions NUMERIC(20, 4),
+            month_name VARCHAR(20),
+            year INTEGER,
+            growth_rate_yoy NUMERIC(10, 2)
+        ) ON COMMIT DROP
+    """))
+    
+    columns = ['sale_date', 'category', 'state', 'turnover_millions', 'month_name', 'year', 'growth_rate_yoy']
+    df[columns].to_sql(
+        'retail_sales_staging', conn, if_exists='append', index=False,
+        method='multi', chunksize=batch_size
+    )
+    
+    if not has_compact_sales(conn):
+        return 'retail_sales_staging'
+    
+    register_codes(conn, 'retail_sales_staging')
+    conn.execute(text("""
+        CREATE TEMP TABLE facts_staging ON COMMIT DROP AS
+        SELECT c.category_id, st.state_id, s.sale_date, s.turnover_millions, s.growth_rate_yoy
+        FROM retail_sales_staging s
+        JOIN category_mapping c ON c.category_code = s.category
+        JOIN state_mapping st ON st.state_code = s.state
+    """))
+    create_sales_partitions(conn, *staged_years(conn, 'facts_staging'))
+    return 'facts_staging'
+
+
+def append_retail_sales(engine, df, chunksize=None):
+    """Append transformed rows to retail_sales (into sales_facts for the compact layout)"""
+    with engine.begin() as conn:
+        if not has_compact_sales(conn):
+            df.to_sql('retail_sales', conn, if_exists='append', index=False, method='multi', chunksize=chunksize)
+            return len(df)
+        
+        stage_sales(conn, df, chunksize or 5000)
+        return conn.execute(text("""
+            INSERT INTO sales_facts (category_id, state_id, sale_date, turnover_millions, growth_rate_yoy)
+            SELECT category_id, state_id, sale_date, turnover_millions, growth_rate_yoy
+            FROM facts_staging
+            ON CONFLICT DO NOTHING
+        """)).rowcount
+
+
+def create_compact_sales(engine):
+    """
+    Migrate retail_sales to the compact star layout
+    
+    Rows move to sales_facts (yearly partitions, smallint category/state
+    keys into the mapping tables, sale_date and the two values; month_name
+    and year are derived in the view), one row per series and month,
+    keeping the newest when the old table holds duplicates. The old table
+    is kept as retail_sales_legacy and replaced by a view with its columns.
+    Runs in one transaction; the change log (if present) moves to
+    sales_facts without a reset.
+    """
+    with engine.begin() as conn:
+        if has_compact_sales(conn):
+            print("Compact layout already in place")
+            return
+        
+        create_dimension_keys(conn)
+        register_codes(conn, 'retail_sales')
+        
+        for name in ('insert', 'update', 'delete', 'truncate'):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS retail_sales_log_{name} ON retail_sales"))
+        conn.execute(text("ALTER TABLE retail_sales RENAME TO retail_sales_legacy"))
+        
+        for statement in COMPACT_SALES_DDL:
+            conn.execute(text(statement))
+        create_sales_partitions(conn, *staged_years(conn, 'retail_sales_legacy'))
+        
+        # Newest row per key, inserted in date order (keeps the BRIN index tight)
+        moved = conn.execute(text("""
+            INSERT INTO sales_facts (category_id, state_id, sale_date, turnover_millions, growth_rate_yoy)
+            SELECT * FROM (
+                SELECT DISTINCT ON (c.category_id, s.state_id, rs.sale_date)
+                    c.category_id, s.state_id, rs.sale_date, rs.turnover_millions, rs.growth_rate_yoy
+                FROM retail_sales_legacy rs
+                JOIN category_mapping c ON c.category_code = rs.category
+                JOIN state_mapping s ON s.state_code = rs.state
+                ORDER BY c.category_id, s.state_id, rs.sale_date, rs.sale_id DESC
+            ) newest
+            ORDER BY sale_date
+        """)).rowcount
+        legacy = conn.execute(text("SELECT COUNT(*) FROM retail_sales_legacy")).scalar()
+        
+        has_change_log = conn.execute(
+            text("SELECT to_regclass('retail_sales_changes') IS NOT NULL")
+        ).scalar()
+        conn.execute(text("ANALYZE sales_facts"))
+    
+    if has_change_log:
+        create_change_log(engine)
+    
+    print(f"🗜️ Moved {moved:,} of {legacy:,} rows to sales_facts "
+          f"({legacy - moved:,} duplicates or rows without a category/state dropped)")
+
+
+def create_partitioned_sales(engine):
+    """
+    Migrate an unpartitioned sales_facts to yearly partitions
+    
+    For databases migrated with create_compact_sales before sales_facts was
+    partitioned. The rows are copied in date order into a new partitioned
+    sales_facts (same indexes, the date B-tree becomes BRIN), the retail_sales
+    view is recreated over it and the old table dropped, in one transaction.
+    The change log (if present) moves to the new table without a reset.
+    """
+    with engine.begin() as conn:
+        relkind = conn.execute(text(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('sales_facts')"
+        )).scalar()
+        if relkind != 'r':
+            print("sales_facts is already partitioned" if relkind == 'p' else "No compact sales layout to partition")
+            return
+        
+        conn.execute(text("DROP VIEW retail_sales"))
+        conn.execute(text("ALTER TABLE sales_facts RENAME TO sales_facts_unpartitioned"))
+        for index in ('sales_facts_pkey', 'idx_facts_sale_date', 'idx_facts_state'):
+            conn.execute(text(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_unpartitioned"))
+        
+        for statement in COMPACT_SALES_DDL:
+            conn.execute(text(statement))
+        create_sales_partitions(conn, *staged_years(conn, 'sales_facts_unpartitioned'))
+        
+        moved = conn.execute(text("""
+            INSERT INTO sales_facts (category_id, state_id, sale_date, turnover_millions, growth_rate_yoy)
+            SELECT category_id, state_id, sale_date, turnover_millions, growth_rate_yoy
+            FROM sales_facts_unpartitioned
+            ORDER BY sale_date
+        """)).rowcount
+        partitions = conn.execute(text(
+            "SELECT COUNT(*) FROM pg_inherits WHERE inhparent = 'sales_facts'::regclass"
+        )).scalar()
+        
+        conn.execute(text("DROP TABLE sales_facts_unpartitioned"))
+        has_change_log = conn.execute(
+            text("SELECT to_regclass('retail_sales_changes') IS NOT NULL")
+        ).scalar()
+        conn.execute(text("ANALYZE sales_facts"))
+    
+    if has_change_log:
+        create_change_log(engine)
+    
+    print(f"📅 Moved {moved:,} rows to {partitions} yearly partitions of sales_facts")
+
+
 class DatabaseLoader:
     """
     Load transformed data into PostgreSQL database
@@ -70,14 +671,8 @@ class DatabaseLoader:
             for i in range(0, len(df), batch_size):
                 batch = df.iloc[i:i+batch_size]
                 
-                # Load to database
-                batch.to_sql(
-                    'retail_sales',
-                    self.engine,
-                    if_exists='append',
-                    index=False,
-                    method='multi'
-                )
+                # Load to database (sales_facts with the compact layout)
+                append_retail_sales(self.engine, batch)
                 
                 total_inserted += len(batch)
                 print(f"  Loaded batch: {total_inserted:,}/{len(df):,} records")
@@ -89,12 +684,254 @@ class DatabaseLoader:
             print(f"   Records after: {new_count:,}")
             print(f"   Records inserted: {new_count - current_count:,}")
             
+            self.refresh_summary('retail_sales')
+            
             return True
             
         except Exception as e:
             print(f"\n❌ Load failed: {e}")
             return False
     
+    def sync_retail_sales(self, df, batch_size=5000):
+        """
+        Make retail_sales match a full transformed extract
+        
+        Unlike load_retail_sales (append only), rows are matched on
+        (sale_date, category, state): revised values are updated, new rows
+        inserted and rows missing from the extract (within its date range)
+        deleted, all in one transaction. Only real differences reach the change log, so re-running
+        the pipeline neither duplicates rows nor re-publishes unchanged ones.
+        """
+        print("="*70)
+        print("SYNCING DATA TO DATABASE")
+        print("="*70)
+        
+        if df.empty:
+            print("❌ Nothing to sync (empty extract)")
+            return False
+        
+        try:
+            with self.engine.begin() as conn:
+                staging = stage_sales(conn, df, batch_size)
+                print(f"  Staged {len(df):,} records")
+                
+                if staging == 'facts_staging':
+                    updated, inserted, deleted = self._sync_facts(conn)
+                else:
+                    updated, inserted, deleted = self._sync_legacy(conn)
+            
+            print(f"\n✅ SYNC COMPLETE!")
+            print(f"   Inserted: {inserted:,}")
+            print(f"   Updated: {updated:,}")
+            print(f"   Deleted: {deleted:,}")
+            
+            self.refresh_summary('retail_sales')
+            
+            return True
+        
+        except Exception as e:
+            print(f"\n❌ Sync failed: {e}")
+            return False
+    
+    def _sync_legacy(self, conn):
+        """Apply retail_sales_staging to the legacy retail_sales table"""
+        updated = conn.execute(text("""
+            UPDATE retail_sales rs SET
+                turnover_millions = s.turnover_millions,
+                month_name = s.month_name,
+                year = s.year,
+                growth_rate_yoy = s.growth_rate_yoy,
+                updated_at = CURRENT_TIMESTAMP
+            FROM retail_sales_staging s
+            WHERE rs.sale_date = s.sale_date
+            AND rs.category = s.category
+            AND rs.state = s.state
+            AND (rs.turnover_millions, rs.growth_rate_yoy, rs.month_name, rs.year)
+                IS DISTINCT FROM (s.turnover_millions, s.growth_rate_yoy, s.month_name, s.year)
+        """)).rowcount
+        
+        inserted = conn.execute(text("""
+            INSERT INTO retail_sales (
+                sale_date, category, state, turnover_millions, month_name, year, growth_rate_yoy, data_source
+            )
+            SELECT s.sale_date, s.category, s.state, s.turnover_millions, s.month_name, s.year, s.growth_rate_yoy, 'ABS_RT'
+            FROM retail_sales_staging s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM retail_sales rs
+                WHERE rs.sale_date = s.sale_date
+                AND rs.category = s.category
+                AND rs.state = s.state
+            )
+        """)).rowcount
+        
+        deleted = conn.execute(text("""
+            DELETE FROM retail_sales rs
+            WHERE rs.sale_date BETWEEN (SELECT MIN(sale_date) FROM retail_sales_staging)
+                AND (SELECT MAX(sale_date) FROM retail_sales_staging)
+            AND NOT EXISTS (
+                SELECT 1 FROM retail_sales_staging s
+                WHERE rs.sale_date = s.sale_date
+                AND rs.category = s.category
+                AND rs.state = s.state
+            )
+        """)).rowcount
+        
+        return updated, inserted, deleted
+    
+    def _sync_facts(self, conn):
+        """Apply facts_staging to sales_facts (compact layout), matching on the primary key"""
+        updated = conn.execute(text("""
+            UPDATE sales_facts f SET
+                turnover_millions = s.turnover_millions,
+                growth_rate_yoy = s.growth_rate_yoy
+            FROM facts_staging s
+            WHERE (f.category_id, f.state_id, f.sale_date) = (s.category_id, s.state_id, s.sale_date)
+            AND (f.turnover_millions, f.growth_rate_yoy)
+                IS DISTINCT FROM (s.turnover_millions, s.growth_rate_yoy)
+        """)).rowcount
+        
+        inserted = conn.execute(text("""
+            INSERT INTO sales_facts (category_id, state_id, sale_date, turnover_millions, growth_rate_yoy)
+            SELECT category_id, state_id, sale_date, turnover_millions, growth_rate_yoy
+            FROM facts_staging
+            ON CONFLICT DO NOTHING
+        """)).rowcount
+        
+        deleted = conn.execute(text("""
+            DELETE FROM sales_facts f
+            WHERE f.sale_date BETWEEN (SELECT MIN(sale_date) FROM facts_staging)
+                AND (SELECT MAX(sale_date) FROM facts_staging)
+            AND NOT EXISTS (
+                SELECT 1 FROM facts_staging s
+                WHERE (f.category_id, f.state_id, f.sale_date) = (s.category_id, s.state_id, s.sale_date)
+            )
+        """)).rowcount
+        
+        return updated, inserted, deleted
+    
+    def reload_sales_year(self, df, year, batch_size=5000):
+        """
+        Replace one year of retail_sales with a partition swap
+        
+        The year's rows (others in df are ignored) are loaded into a new table
+        shaped like sales_facts, which then replaces the year's partition
+        (detach, attach, drop) in one transaction: no row deletes on the live
+        table, and readers see either the old year or the new one. The
+        triggers don't fire on a swap, so the differences are written to the
+        change log here. Needs the partitioned layout (src/utils/partition_sales.py).
+        """
+        print("="*70)
+        print(f"RELOADING {year} (PARTITION SWAP)")
+        print("="*70)
+        
+        rows = df[df['year'] == year]
+        if rows.empty:
+            print(f"❌ No {year} rows in the extract")
+            return False
+        
+        partition = sales_partition(year)
+        staging = f"{partition}_new"
+        bounds = f"FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        
+        try:
+            with self.engine.begin() as conn:
+                partitioned = conn.execute(text(
+                    "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('sales_facts')"
+                )).scalar()
+                if not partitioned:
+                    print("❌ sales_facts is not partitioned (run src/utils/partition_sales.py)")
+                    return False
+                
+                stage_sales(conn, rows, batch_size)
+                
+                conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+                conn.execute(text(f"CREATE TABLE {staging} (LIKE sales_facts INCLUDING ALL)"))
+                # Matches the partition bound, so ATTACH skips its validation scan
+                conn.execute(text(f"""
+                    ALTER TABLE {staging} ADD CONSTRAINT {staging}_bounds
+                    CHECK (sale_date >= '{year}-01-01' AND sale_date < '{year + 1}-01-01')
+                """))
+                loaded = conn.execute(text(f"""
+                    INSERT INTO {staging} (category_id, state_id, sale_date, turnover_millions, growth_rate_yoy)
+                    SELECT category_id, state_id, sale_date, turnover_millions, growth_rate_yoy
+                    FROM facts_staging
+                    ORDER BY sale_date
+                    ON CONFLICT DO NOTHING
+                """)).rowcount
+                print(f"  Loaded {loaded:,} rows into {staging}")
+                
+                changes = self._log_partition_changes(conn, partition, staging)
+                
+                conn.execute(text(f"ALTER TABLE sales_facts DETACH PARTITION {partition}"))
+                conn.execute(text(f"ALTER TABLE sales_facts ATTACH PARTITION {staging} FOR VALUES {bounds}"))
+                conn.execute(text(f"DROP TABLE {partition}"))
+                conn.execute(text(f"ALTER TABLE {staging} RENAME TO {partition}"))
+                conn.execute(text(f"ALTER TABLE {partition} DROP CONSTRAINT {staging}_bounds"))
+                
+                indexes = conn.execute(
+                    text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {'table': partition}
+                ).scalars().all()
+                for index in indexes:
+                    conn.execute(text(f"ALTER INDEX {index} RENAME TO {index.replace(staging, partition, 1)}"))
+                
+                conn.execute(text(f"ANALYZE {partition}"))
+            
+            print(f"\n✅ RELOAD COMPLETE!")
+            print(f"   Inserted: {changes.get('I', 0):,}")
+            print(f"   Updated: {changes.get('U', 0):,}")
+            print(f"   Deleted: {changes.get('D', 0):,}")
+            
+            self.refresh_summary('retail_sales')
+            
+            return True
+        
+        except Exception as e:
+            print(f"\n❌ Reload failed: {e}")
+            return False
+    
+    def _log_partition_changes(self, conn, partition, staging):
+        """Log the rows a partition swap inserts, updates and deletes; returns {op: count}"""
+        conn.execute(text(f"""
+            CREATE TEMP TABLE partition_changes ON COMMIT DROP AS
+            SELECT
+                CASE WHEN o.sale_date IS NULL THEN 'I' WHEN n.sale_date IS NULL THEN 'D' ELSE 'U' END as op,
+                COALESCE(n.category_id, o.category_id) as category_id,
+                COALESCE(n.state_id, o.state_id) as state_id,
+                COALESCE(n.sale_date, o.sale_date) as sale_date,
+                CASE WHEN n.sale_date IS NULL THEN o.turnover_millions ELSE n.turnover_millions END as turnover_millions,
+                CASE WHEN n.sale_date IS NULL THEN o.growth_rate_yoy ELSE n.growth_rate_yoy END as growth_rate_yoy
+            FROM {staging} n
+            FULL JOIN {partition} o
+                ON o.category_id = n.category_id
+                AND o.state_id = n.state_id
+                AND o.sale_date = n.sale_date
+            WHERE (n.sale_date, n.turnover_millions, n.growth_rate_yoy)
+                IS DISTINCT FROM (o.sale_date, o.turnover_millions, o.growth_rate_yoy)
+        """))
+        
+        # Stamped like the triggers do: the version the summary refresh will publish
+        if conn.execute(text("SELECT to_regclass('retail_sales_changes') IS NOT NULL")).scalar():
+            conn.execute(text("""
+                INSERT INTO retail_sales_changes (
+                    data_version, op, sale_date, category, state, turnover_millions, growth_rate_yoy
+                )
+                SELECT
+                    (SELECT COALESCE(MAX(data_version), 0) + 1 FROM dataset_summary WHERE dataset = 'retail_sales'),
+                    p.op, p.sale_date, c.category_code, s.state_code, p.turnover_millions, p.growth_rate_yoy
+                FROM partition_changes p
+                JOIN category_mapping c ON c.category_id = p.category_id
+                JOIN state_mapping s ON s.state_id = p.state_id
+            """))
+        
+        return dict(conn.execute(text("SELECT op, COUNT(*) FROM partition_changes GROUP BY op")).fetchall())
+    
+    def refresh_summary(self, dataset):
+        """Refresh the API summary row for 'retail_sales' or 'sales_forecasts'"""
+        try:
+            refresh_dataset_summary(self.engine, dataset)
+        except Exception as e:
+            print(f"⚠️ Could not refresh {dataset} summary: {e}")
+    
     def log_etl_job(self, job_name, status, records_processed, records_inserted, 
                     execution_time, error_message=None):
         """Log ETL job execution to etl_logs table"""
@@ -74,8 +74,8 @@ def run_full_etl_pipeline():
         print("❌ Data quality checks failed")
         return False
     
-    # Load to database
-    success = loader.load_retail_sales(df_clean, batch_size=5000)
+    # Sync to database (updates revised rows instead of appending duplicates)
+    success = loader.sync_retail_sales(df_clean, batch_size=5000)
     
     if not success:
         print("❌ Load failed")
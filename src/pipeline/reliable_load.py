@@ -4,6 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from extract.abs_api import ABSRetailDataExtractor
 from transform.clean_retail_data import RetailDataTransformer
+from load.db_loader import append_retail_sales, refresh_dataset_summary
 from datetime import datetime
 import pandas as pd
 from sqlalchemy import create_engine, text
@@ -64,7 +65,7 @@ def load_with_smaller_batches():
         batch = df_clean.iloc[i:i+batch_size]
         
         try:
-            batch.to_sql('retail_sales', engine, if_exists='append', index=False, method='multi', chunksize=10)
+            append_retail_sales(engine, batch, chunksize=10)
             total_loaded += len(batch)
             
             if total_loaded % 500 == 0:
@@ -77,6 +78,8 @@ def load_with_smaller_batches():
                 print("Too many failures, stopping")
                 break
     
+    refresh_dataset_summary(engine, 'retail_sales')
+    
     end_time = datetime.now()
     execution_time = (end_time - start_time).total_seconds()
     
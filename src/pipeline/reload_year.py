@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extract.abs_api import ABSRetailDataExtractor
+from transform.clean_retail_data import RetailDataTransformer
+from load.db_loader import DatabaseLoader
+from datetime import datetime
+import argparse
+
+def reload_year(year):
+    """
+    Re-extract one year from the ABS and swap it into retail_sales
+    
+    For revisions confined to a year: the year's partition is replaced
+    whole instead of syncing the full history row by row.
+    """
+    
+    print("="*80)
+    print(f"RELOAD {year}: AUSTRALIAN RETAIL INTELLIGENCE")
+    print("="*80)
+    
+    start_time = datetime.now()
+    
+    extractor = ABSRetailDataExtractor()
+    transformer = RetailDataTransformer()
+    loader = DatabaseLoader()
+    
+    # The year before as well: growth_rate_yoy compares with the same month a year earlier
+    df_raw = extractor.extract_retail_sales(start_date=f'{year - 1}-01', end_date=f'{year}-12')
+    
+    if df_raw is None or len(df_raw) == 0:
+        print("❌ Extraction failed or returned no data")
+        return False
+    
+    try:
+        df_clean = transformer.transform(df_raw)
+    except Exception as e:
+        print(f"❌ Transformation failed: {e}")
+        return False
+    
+    if not loader.verify_data_quality(df_clean):
+        print("❌ Data quality checks failed")
+        return False
+    
+    if not loader.reload_sales_year(df_clean, year):
+        print("❌ Reload failed")
+        return False
+    
+    execution_time = (datetime.now() - start_time).total_seconds()
+    loader.log_etl_job(
+        job_name='reload_year',
+        status='SUCCESS',
+        records_processed=len(df_raw),
+        records_inserted=int((df_clean['year'] == year).sum()),
+        execution_time=execution_time
+    )
+    
+    print(f"\n🎉 {year} reloaded in {execution_time:.1f}s")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replace one year of retail sales from a fresh ABS extract")
+    parser.add_argument('--year', type=int, required=True)
+    args = parser.parse_args()
+    
+    success = reload_year(args.year)
+    sys.exit(0 if success else 1)
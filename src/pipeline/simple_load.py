@@ -4,6 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from extract.abs_api import ABSRetailDataExtractor
 from transform.clean_retail_data import RetailDataTransformer
+from load.db_loader import append_retail_sales, refresh_dataset_summary
 from datetime import datetime
 import pandas as pd
 from sqlalchemy import create_engine
@@ -59,10 +60,12 @@ def simple_etl():
     
     for i in range(0, len(df_clean), batch_size):
         batch = df_clean.iloc[i:i+batch_size]
-        batch.to_sql('retail_sales', engine, if_exists='append', index=False, method='multi')
+        append_retail_sales(engine, batch)
         total_loaded += len(batch)
         print(f"  Loaded {total_loaded:,}/{len(df_clean):,} records...")
     
+    refresh_dataset_summary(engine, 'retail_sales')
+    
     end_time = datetime.now()
     execution_time = (end_time - start_time).total_seconds()
     
@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load.db_loader import DatabaseLoader, create_series_indexes
+
+def add_series_indexes():
+    """Migration: composite (category, state, date) indexes on the fact tables"""
+    
+    print("="*70)
+    print("ADDING COMPOSITE SERIES INDEXES")
+    print("="*70)
+    
+    loader = DatabaseLoader()
+    create_series_indexes(loader.engine)
+    
+    print("\n✅ Indexes built without blocking reads or writes")
+    print("   Check query plans with: python src/utils/index_advisor.py")
+
+if __name__ == "__main__":
+    add_series_indexes()
@@ -0,0 +1,20 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load.db_loader import DatabaseLoader, create_change_log
+
+def setup_change_log():
+    """Create the retail_sales change log behind GET /sales/changes"""
+    
+    print("="*70)
+    print("SETTING UP RETAIL SALES CHANGE LOG")
+    print("="*70)
+    
+    loader = DatabaseLoader()
+    create_change_log(loader.engine)
+    
+    print("\n✅ Changes to retail_sales are now logged per data version")
+
+if __name__ == "__main__":
+    setup_change_log()
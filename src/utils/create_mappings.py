@@ -27,9 +27,11 @@ def create_mapping_tables():
             CREATE TABLE IF NOT EXISTS state_mapping (
                 state_code VARCHAR(10) PRIMARY KEY,
                 state_name VARCHAR(100) NOT NULL,
-                state_full_name VARCHAR(200) NOT NULL
+                state_full_name VARCHAR(200) NOT NULL,
+                state_id SMALLINT GENERATED BY DEFAULT AS IDENTITY
             );
         """))
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS idx_state_id ON state_mapping(state_id)"))
         conn.commit()
         
         # Insert Australian states (ABS standard codes)
@@ -65,9 +67,11 @@ def create_mapping_tables():
             CREATE TABLE IF NOT EXISTS category_mapping (
                 category_code VARCHAR(10) PRIMARY KEY,
                 category_name VARCHAR(200) NOT NULL,
-                category_description VARCHAR(500)
+                category_description VARCHAR(500),
+                category_id SMALLINT GENERATED BY DEFAULT AS IDENTITY
             );
         """))
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS idx_category_id ON category_mapping(category_id)"))
         conn.commit()
         
         # Insert retail categories (ABS Retail Trade categories)
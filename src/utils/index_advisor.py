@@ -0,0 +1,169 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from dotenv import load_dotenv
+import argparse
+import asyncio
+import json
+import tempfile
+
+load_dotenv()
+
+# Representative API requests; their SQL is captured through the slow-query
+# log, so the advisor always checks the queries the API really sends
+API_REQUESTS = (
+    '/sales?category=20&state=AUS&limit=100',
+    '/sales?category=1&start_date=2020-01-01',
+    '/sales?state=2&start_date=2023-01-01',
+    '/sales?start_date=2024-01-01',
+    '/sales/aggregate?group_by=year&metric=sum&category=20&state=AUS',
+    '/sales/aggregate?group_by=state&metric=yoy',
+    '/forecasts?category=20&state=AUS',
+    '/forecasts?category=1',
+    '/accuracy?category=20&state=AUS',
+    '/series/20/AUS?forecast=true',
+    '/series/1/2?start_date=2015-01-01',
+    '/insights/top-movers?scope=series',
+)
+
+# Sequential scans reading fewer rows than this are fine (mappings, summaries,
+# a single yearly sales_facts partition)
+MIN_TABLE_ROWS = 10000
+
+def capture_api_queries(log_path):
+    """Run API_REQUESTS in-process, logging every query (SLOW_QUERY_MS=0)"""
+    os.environ.update({
+        'SLOW_QUERY_MS': '0',
+        'SLOW_QUERY_LOG': log_path,
+        'SLOW_QUERY_EXPLAIN': '0',
+        'RESPONSE_CACHE_MB': '0',
+        'SALES_SNAPSHOT': '0',
+        'STARTUP_WARMUP': '0',
+    })
+    os.environ.pop('SHARED_CACHE_PATH', None)
+    
+    from api.main import app
+    from api.startup import asgi_get
+    
+    async def run():
+        async with app.router.lifespan_context(app):
+            for path in API_REQUESTS:
+                status = await asgi_get(app, path)
+                print(f"   {status}  {path}")
+    
+    asyncio.run(run())
+
+def read_queries(log_path):
+    """Distinct (route, sql, params) from a slow-query log, first occurrence of each"""
+    queries = {}
+    with open(log_path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('route') and record['sql'] not in queries:
+                queries[record['sql']] = (record['route'], record['params'])
+    return [(route, sql, params) for sql, (route, params) in queries.items()]
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+def table_rows(conn):
+    """Estimated rows of each table and partition, and the table each partition belongs to"""
+    rows = conn.execute(text("""
+        SELECT c.relname, GREATEST(c.reltuples, 0)::bigint, COALESCE(root.relname, c.relname)
+        FROM pg_class c
+        LEFT JOIN pg_class root ON root.oid = pg_partition_root(c.oid)
+        WHERE c.relkind IN ('r', 'p') AND c.relnamespace = 'public'::regnamespace
+    """)).fetchall()
+    sizes = {name: count for name, count, _ in rows}
+    roots = {name: root for name, _, root in rows}
+    return sizes, roots
+
+def seq_scans(nodes, sizes, roots):
+    """
+    Sequential scans in a plan, one (table, partitions, rows, filter) per table
+    
+    Scans of a partitioned table's partitions count together: each yearly
+    sales_facts partition is small, but a scan of all of them reads the whole
+    table. Tables whose scanned rows stay under MIN_TABLE_ROWS are left out.
+    """
+    scanned = {}
+    for node in nodes:
+        if node['Node Type'] == 'Seq Scan':
+            relation = node['Relation Name']
+            scanned.setdefault(roots.get(relation, relation), []).append(node)
+    
+    findings = []
+    for table, scans in scanned.items():
+        # A relation scanned more than once in the plan (e.g. in two CTEs) counts once
+        relations = {node['Relation Name'] for node in scans}
+        rows = sum(sizes.get(relation, 0) for relation in relations)
+        if rows >= MIN_TABLE_ROWS:
+            findings.append((table, len(relations), rows, scans[0].get('Filter')))
+    return findings
+
+def advise(log_path=None, analyze=False):
+    """EXPLAIN each API query shape and report sequential scans of large tables"""
+    
+    print("="*70)
+    print("INDEX ADVISOR")
+    print("="*70)
+    
+    if log_path is None:
+        log_path = os.path.join(tempfile.mkdtemp(), 'api_queries.log')
+        print("\n🔎 Capturing API queries:")
+        capture_api_queries(log_path)
+    else:
+        print(f"\n🔎 Reading queries from {log_path}")
+    
+    queries = read_queries(log_path)
+    
+    connection_string = (
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    )
+    engine = create_engine(connection_string, pool_pre_ping=True)
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    findings = 0
+    
+    with engine.connect() as conn:
+        sizes, roots = table_rows(conn)
+        
+        for route, sql, params in queries:
+            plan = conn.execute(text(f"EXPLAIN ({options}) {sql}"), params).scalar()
+            plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+            nodes = list(plan_nodes(plan['Plan']))
+            
+            scans = seq_scans(nodes, sizes, roots)
+            indexes = sorted({node['Index Name'] for node in nodes if 'Index Name' in node})
+            
+            timing = f", {plan['Execution Time']:.1f} ms" if analyze else ""
+            print(f"\n{'⚠️ ' if scans else '✅'} {route} (cost {plan['Plan']['Total Cost']:,.0f}{timing})")
+            print(f"   {sql[:110]}{'...' if len(sql) > 110 else ''}")
+            if indexes:
+                # Partitioned tables use one index per partition
+                shown = ', '.join(indexes[:4]) + (f" (+{len(indexes) - 4} more)" if len(indexes) > 4 else "")
+                print(f"   Indexes: {shown}")
+            for table, partitions, rows, condition in scans:
+                findings += 1
+                spread = f", {partitions} partitions" if partitions > 1 else ""
+                print(f"   Seq Scan on {table} ({rows:,} rows{spread})"
+                      f"{' filter: ' + condition if condition else ''}")
+        
+        conn.rollback()
+    
+    print("\n" + "="*70)
+    if findings:
+        print(f"⚠️ {findings} sequential scan(s) of large tables in {len(queries)} queries")
+    else:
+        print(f"✅ No sequential scans of large tables in {len(queries)} queries")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report sequential scans in the API's query plans")
+    parser.add_argument('--log', help="Slow-query log to analyse (e.g. logs/slow_queries.log from SLOW_QUERY_MS=0)")
+    parser.add_argument('--analyze', action='store_true', help="Use EXPLAIN ANALYZE (runs each query)")
+    args = parser.parse_args()
+    advise(args.log, args.analyze)
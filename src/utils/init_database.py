@@ -1,6 +1,11 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
-import os
+
+from load.db_loader import create_change_log
 
 load_dotenv()
 
@@ -32,12 +37,21 @@ def create_database_tables():
                     conn.execute(text(statement))
                     conn.commit()
         
+        # Triggers and the first 'R' marker for /sales/changes (the function
+        # bodies can't go through the semicolon split above)
+        create_change_log(engine)
+        
         print("\n✅ DATABASE SCHEMA CREATED SUCCESSFULLY!")
         print("Tables created:")
-        print("  - retail_sales")
+        print("  - state_mapping")
+        print("  - category_mapping")
+        print("  - sales_facts (read through the retail_sales view)")
         print("  - sales_forecasts")
         print("  - etl_logs")
         print("  - data_quality")
+        print("  - dataset_summary")
+        print("  - retail_sales_changes")
+        print("  - series_rankings")
         
         return True
         
@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from load.db_loader import DatabaseLoader, create_compact_sales
+
+def table_size(conn, name):
+    return conn.execute(text(
+        "SELECT COALESCE(pg_total_relation_size(to_regclass(:name)), 0)"
+    ), {'name': name}).scalar()
+
+def migrate_compact_sales():
+    """Migration: move retail_sales to sales_facts (smallint keys) behind a retail_sales view"""
+    
+    print("="*70)
+    print("MIGRATING RETAIL SALES TO THE COMPACT LAYOUT")
+    print("="*70)
+    
+    loader = DatabaseLoader()
+    create_compact_sales(loader.engine)
+    
+    with loader.engine.connect() as conn:
+        legacy = table_size(conn, 'retail_sales_legacy')
+        facts = table_size(conn, 'sales_facts')
+    
+    print(f"\n✅ retail_sales is now a view over sales_facts")
+    print(f"   sales_facts: {facts / 1024 / 1024:,.1f} MB with indexes "
+          f"(retail_sales_legacy: {legacy / 1024 / 1024:,.1f} MB)")
+    print("   Once the API is verified: DROP TABLE retail_sales_legacy")
+
+if __name__ == "__main__":
+    migrate_compact_sales()
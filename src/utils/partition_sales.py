@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from load.db_loader import DatabaseLoader, create_compact_sales, create_partitioned_sales
+
+def partition_sales():
+    """Migration: yearly partitions of sales_facts with a BRIN index on sale_date"""
+    
+    print("="*70)
+    print("PARTITIONING RETAIL SALES BY YEAR")
+    print("="*70)
+    
+    loader = DatabaseLoader()
+    
+    # Databases still on the old retail_sales table get the compact layout,
+    # which is created partitioned
+    create_compact_sales(loader.engine)
+    create_partitioned_sales(loader.engine)
+    
+    with loader.engine.connect() as conn:
+        partitions = conn.execute(text("""
+            SELECT c.relname, c.reltuples::bigint FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'sales_facts'::regclass
+            ORDER BY c.relname DESC
+            LIMIT 3
+        """)).fetchall()
+    
+    print("\n✅ Recent-window queries now read only the partitions they cover")
+    for name, rows in partitions:
+        print(f"   {name}: {rows:,} rows")
+    print("   Reload a year with: python src/pipeline/reload_year.py --year 2024")
+
+if __name__ == "__main__":
+    partition_sales()
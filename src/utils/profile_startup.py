@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import subprocess
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Requests a dashboard makes on its first load
+FIRST_REQUESTS = ('/sales/summary', '/forecasts/summary', '/categories', '/states', '/sales?limit=100')
+
+def import_breakdown(top=12):
+    """Cumulative import time of api.main's direct imports (python -X importtime)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import api.main'],
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Direct imports of api.main are one level below it (two spaces + one)
+        if name.startswith('   ') and not name.startswith('    '):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    
+    return sorted(modules, reverse=True)[:top]
+
+async def first_requests(warm_up):
+    """Import the app, start it and time the first dashboard requests"""
+    os.environ['STARTUP_WARMUP'] = '1' if warm_up else '0'
+    
+    started = time.perf_counter()
+    from api.main import app, startup_profile
+    from api.startup import asgi_get
+    imported = time.perf_counter() - started
+    
+    timings = {}
+    async with app.router.lifespan_context(app):
+        if warm_up:
+            # Wait for the background warm-up (it only logs failures)
+            for _ in range(600):
+                if 'warm' in startup_profile.phases:
+                    break
+                await asyncio.sleep(0.1)
+        
+        for path in FIRST_REQUESTS:
+            request_started = time.perf_counter()
+            status = await asgi_get(app, path, [('accept-encoding', 'br, gzip')])
+            timings[path] = (status, time.perf_counter() - request_started)
+    
+    return imported, startup_profile.report(), timings
+
+def profile_startup():
+    """Report where API cold-start time goes: imports, first query, first requests"""
+    
+    warm_up = '--warm' in sys.argv
+    
+    print("="*70)
+    print("API STARTUP PROFILE" + (" (with warm-up)" if warm_up else " (no warm-up)"))
+    print("="*70)
+    
+    print("\n📦 Slowest imports (cumulative ms):")
+    for ms, name in import_breakdown():
+        print(f"   {ms:8.1f}  {name}")
+    
+    imported, phases, timings = asyncio.run(first_requests(warm_up))
+    
+    print(f"\n⏱️  Importing api.main: {imported * 1000:,.0f} ms")
+    print("\n⏱️  Startup phases (ms since api.main was imported, or phase duration):")
+    for phase, ms in phases.items():
+        print(f"   {phase:<20} {ms:10,.1f}")
+    
+    print("\n🌐 First requests:")
+    for path, (status, seconds) in timings.items():
+        print(f"   {status}  {seconds * 1000:8.1f} ms  {path}")
+    
+    print("\n✅ Compare runs with and without --warm to see what the warm-up saves")
+
+if __name__ == "__main__":
+    profile_startup()
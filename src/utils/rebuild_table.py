@@ -1,11 +1,16 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
-import os
+
+from load.db_loader import COMPACT_SALES_DDL, create_change_log, create_dimension_keys, has_compact_sales
 
 load_dotenv()
 
 def rebuild_retail_sales_table():
-    """Drop and recreate retail_sales table with proper schema"""
+    """Drop and recreate retail_sales (sales_facts and its view) with proper schema"""
     
     print("⚠️  WARNING: This will delete all data in retail_sales table!")
     confirm = input("Type 'yes' to continue: ")
@@ -21,39 +26,33 @@ def rebuild_retail_sales_table():
     engine = create_engine(connection_string, pool_pre_ping=True)
     
     with engine.connect() as conn:
-        # Drop existing table
+        # Drop existing table (or the compact layout's view and facts)
         print("\nDropping old table...")
-        conn.execute(text("DROP TABLE IF EXISTS retail_sales CASCADE"))
+        if has_compact_sales(conn):
+            conn.execute(text("DROP VIEW IF EXISTS retail_sales"))
+            conn.execute(text("DROP TABLE sales_facts"))
+        else:
+            conn.execute(text("DROP TABLE IF EXISTS retail_sales CASCADE"))
         conn.commit()
         
-        # Create new table with correct schema
+        # Create the compact layout: sales_facts, its indexes and the retail_sales view
+        # (needs the mapping tables from create_mappings.py)
         print("Creating new table with proper schema...")
-        conn.execute(text("""
-            CREATE TABLE retail_sales (
-                sale_id SERIAL PRIMARY KEY,
-                sale_date DATE NOT NULL,
-                category VARCHAR(200),
-                state VARCHAR(50),
-                turnover_millions NUMERIC(20, 4),
-                month_name VARCHAR(20),
-                year INTEGER,
-                growth_rate_yoy NUMERIC(10, 2),
-                data_source VARCHAR(100) DEFAULT 'ABS_RT',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """))
+        create_dimension_keys(conn)
+        for statement in COMPACT_SALES_DDL:
+            conn.execute(text(statement))
         conn.commit()
         
-        # Create indexes
-        print("Creating indexes...")
-        conn.execute(text("CREATE INDEX idx_sale_date ON retail_sales(sale_date)"))
-        conn.execute(text("CREATE INDEX idx_category ON retail_sales(category)"))
-        conn.execute(text("CREATE INDEX idx_state ON retail_sales(state)"))
-        conn.commit()
-        
-        print("\n✅ Table rebuilt successfully!")
-        print("   - turnover_millions: NUMERIC(20, 4) - supports values up to 9,999,999,999,999,999.9999")
+        has_change_log = conn.execute(
+            text("SELECT to_regclass('retail_sales_changes') IS NOT NULL")
+        ).scalar()
+    
+    # Triggers were dropped with the table; earlier changes no longer apply
+    if has_change_log:
+        create_change_log(engine, reset=True)
+    
+    print("\n✅ Table rebuilt successfully!")
+    print("   - turnover_millions: NUMERIC(20, 4) - supports values up to 9,999,999,999,999,999.9999")
 
 if __name__ == "__main__":
     rebuild_retail_sales_table()
\ No newline at end of file
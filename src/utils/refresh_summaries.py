@@ -0,0 +1,22 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load.db_loader import DatabaseLoader, SUMMARY_SOURCES
+
+def refresh_all_summaries():
+    """Rebuild dataset_summary rows (use after manual data changes)"""
+    
+    print("="*70)
+    print("REFRESHING DATASET SUMMARIES")
+    print("="*70)
+    
+    loader = DatabaseLoader()
+    
+    for dataset in SUMMARY_SOURCES:
+        loader.refresh_summary(dataset)
+    
+    print("\n✅ Summaries refreshed")
+
+if __name__ == "__main__":
+    refresh_all_summaries()
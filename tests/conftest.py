@@ -0,0 +1,44 @@
+import sys
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+# Modules import each other as top-level packages (api.*, load.*), as in src/api/main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+# api.main builds its engine URL at import; the port must parse even without a database
+os.environ.setdefault('DB_PORT', '5432')
+
+@pytest.fixture
+def db_connection():
+    """Connection to the DB_* database (tests are skipped when it is not reachable)"""
+    if not os.getenv('DB_HOST'):
+        pytest.skip("DB_HOST not set")
+    
+    from load.db_loader import DatabaseLoader
+    engine = DatabaseLoader().engine
+    try:
+        conn = engine.connect()
+    except Exception as e:
+        pytest.skip(f"database not reachable: {e}")
+    
+    try:
+        yield conn
+    finally:
+        conn.close()
+        engine.dispose()
+
+@pytest.fixture
+def fresh_database(db_connection, monkeypatch):
+    """Empty scratch database on the DB_* server; DB_NAME points at it for the test"""
+    name = f"retail_test_{uuid.uuid4().hex[:8]}"
+    admin = db_connection.execution_options(isolation_level='AUTOCOMMIT')
+    admin.execute(text(f"CREATE DATABASE {name}"))
+    monkeypatch.setenv('DB_NAME', name)
+    
+    try:
+        yield name
+    finally:
+        admin.execute(text(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
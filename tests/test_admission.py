@@ -0,0 +1,57 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api import admission
+from api.admission import AdmissionMiddleware, estimate_aggregate_cost, estimate_batch_cost
+
+def selectors(count):
+    return {'series': [{'category': str(i), 'state': 'AUS'} for i in range(count)]}
+
+async def echo(request):
+    body = await request.json()
+    return JSONResponse({'selectors': len(body['series'])})
+
+async def aggregate(request):
+    return JSONResponse({'data': []})
+
+@pytest.fixture
+def client(monkeypatch):
+    # Every request classed as heavy is rejected, so 429 means "heavy"
+    async def always_full(self):
+        return 'full'
+    monkeypatch.setattr(admission.RouteLimiter, 'acquire', always_full)
+    
+    app = Starlette(routes=[
+        Route('/series/batch', echo, methods=['POST']),
+        Route('/sales/aggregate', aggregate),
+    ])
+    app.add_middleware(AdmissionMiddleware, routes=('/series/batch', '/sales/aggregate'), heavy_rows=20000)
+    return TestClient(app)
+
+def test_batch_cost_counts_distinct_selectors():
+    assert estimate_batch_cost(b'{"series": [{"category": "20", "state": "AUS"}, {"category": "20", "state": "AUS"}]}') == 600
+    assert estimate_batch_cost(b'not json') == 0
+
+def test_small_batch_is_admitted_with_its_body(client):
+    response = client.post('/series/batch', json=selectors(3))
+    
+    assert response.status_code == 200
+    assert response.json() == {'selectors': 3}
+
+def test_large_batch_is_heavy(client):
+    assert client.post('/series/batch', json=selectors(40)).status_code == 429
+
+def test_aggregate_cost_is_months_times_series():
+    assert estimate_aggregate_cost({'start_date': '2020-01-01', 'end_date': '2021-12-31'}) == 24 * 250
+    assert estimate_aggregate_cost({'category': '20', 'start_date': '2020-01-01', 'end_date': '2020-06-01'}) == 6 * 10
+
+@pytest.mark.parametrize('query, status', [
+    ('group_by=year', 429),
+    ('group_by=state&start_date=2022-01-01&end_date=2023-12-31', 200),
+    ('group_by=year&category=20', 200),
+])
+def test_aggregate_is_heavy_only_over_many_series_and_years(client, query, status):
+    assert client.get(f'/sales/aggregate?{query}').status_code == status
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from api.main import build_aggregate_query, build_sales_filters
+from api.snapshot import SalesSnapshot
+
+def monthly_sales(start, end, value=100.0, category='20', state='AUS'):
+    return pd.DataFrame({
+        'sale_date': pd.date_range(start, end, freq='MS').date,
+        'category': category,
+        'state': state,
+        'turnover_millions': value,
+        'growth_rate_yoy': None,
+    })
+
+# 1983 starts in October (partial year, complete Q4), 1984-1985 are complete,
+# 1986 is missing entirely and 1987 is complete again
+SALES = pd.concat([
+    monthly_sales('1983-10-01', '1983-12-01', 50.0),
+    monthly_sales('1984-01-01', '1984-12-01', 100.0),
+    monthly_sales('1985-01-01', '1985-12-01', 110.0),
+    monthly_sales('1987-01-01', '1987-12-01', 121.0),
+], ignore_index=True)
+
+EXPECTED = {
+    'year': {1983: None, 1984: None, 1985: 10.0, 1987: None},
+    'quarter': {
+        (1983, 4): None,
+        (1984, 1): None, (1984, 2): None, (1984, 3): None, (1984, 4): 100.0,
+        **{(1985, q): 10.0 for q in range(1, 5)},
+        **{(1987, q): None for q in range(1, 5)},
+    },
+}
+
+def as_growth(result, group_by):
+    keys = ['year'] if group_by == 'year' else ['year', 'quarter']
+    values = {}
+    for row in result.to_dict('records'):
+        key = int(row['year']) if group_by == 'year' else (int(row['year']), int(row['quarter']))
+        values[key] = None if pd.isna(row['value']) else float(row['value'])
+    return values
+
+@pytest.mark.parametrize('group_by', ['year', 'quarter'])
+def test_snapshot_yoy_needs_complete_periods_a_year_apart(group_by):
+    snapshot = SalesSnapshot(SALES, version=1)
+    
+    result = snapshot.aggregate(group_by, 'yoy')
+    
+    assert as_growth(result, group_by) == EXPECTED[group_by]
+
+def test_snapshot_yoy_date_cut_leaves_partial_periods_null():
+    snapshot = SalesSnapshot(SALES, version=1)
+    
+    result = snapshot.aggregate('year', 'yoy', start=pd.Timestamp('1984-03-01').date())
+    
+    assert as_growth(result, 'year') == {1984: None, 1985: None, 1987: None}
+
+@pytest.mark.parametrize('group_by', ['year', 'quarter'])
+def test_sql_yoy_matches_snapshot(db_connection, group_by):
+    # A temporary table shadows the retail_sales view for this session
+    db_connection.execute(text("""
+        CREATE TEMP TABLE retail_sales (
+            sale_date DATE, category TEXT, state TEXT,
+            turnover_millions NUMERIC(12, 4), growth_rate_yoy NUMERIC
+        ) ON COMMIT DROP
+    """))
+    db_connection.execute(
+        text("INSERT INTO retail_sales VALUES (:sale_date, :category, :state, :turnover_millions, NULL)"),
+        SALES.drop(columns='growth_rate_yoy').to_dict('records')
+    )
+    conditions, params = build_sales_filters()
+    
+    rows = db_connection.execute(text(build_aggregate_query(group_by, 'yoy', conditions)), params)
+    result = pd.DataFrame(rows.mappings().all())
+    
+    assert as_growth(result, group_by) == EXPECTED[group_by]
+    db_connection.rollback()
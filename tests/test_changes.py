@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+
+import api.main as main
+
+class FixedVersions:
+    def __init__(self, version):
+        self.version = version
+    
+    async def current(self):
+        return {'retail_sales': self.version}
+
+def serve_change_log(monkeypatch, version, markers):
+    """Point the endpoint at a change log with the given 'R' versions and no rows"""
+    async def read_sql(engine, query, params=None):
+        if "op = 'R'" in query:
+            published = [marker for marker in markers if marker <= params['current']]
+            return pd.DataFrame({'version': [max(published) if published else None], 'markers': [len(markers)]})
+        return pd.DataFrame(columns=[
+            'version', 'op', 'sale_date', 'category_code', 'state_code', 'turnover_millions', 'growth_rate_yoy'
+        ])
+    
+    monkeypatch.setattr(main, 'data_versions', FixedVersions(version))
+    monkeypatch.setattr(main, 'read_sql', read_sql)
+
+def status_of(since):
+    try:
+        asyncio.run(main.get_sales_changes(since=since))
+    except HTTPException as e:
+        return e.status_code
+    return 200
+
+def test_change_log_without_reset_marker_is_not_set_up(monkeypatch):
+    serve_change_log(monkeypatch, version=1, markers=[])
+    
+    assert status_of(0) == 404
+
+def test_since_newer_than_current_version_is_rejected(monkeypatch):
+    serve_change_log(monkeypatch, version=3, markers=[0])
+    
+    assert status_of(3) == 200
+    assert status_of(4) == 400
+
+def test_since_before_reset_is_gone(monkeypatch):
+    serve_change_log(monkeypatch, version=5, markers=[0, 4])
+    
+    assert status_of(3) == 410
+    assert status_of(4) == 200
+
+def test_init_database_installs_change_log(fresh_database, monkeypatch):
+    from load.db_loader import append_retail_sales
+    from utils.init_database import create_database_tables
+    
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert create_database_tables()
+    
+    engine = create_engine(
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{fresh_database}"
+    )
+    try:
+        append_retail_sales(engine, pd.DataFrame({
+            'sale_date': pd.to_datetime(['2024-01-01', '2024-02-01']).date,
+            'category': '20', 'state': 'AUS', 'turnover_millions': [1.5, 2.5],
+            'month_name': ['January', 'February'], 'year': 2024, 'growth_rate_yoy': None,
+        }))
+        with engine.connect() as conn:
+            ops = conn.execute(text(
+                "SELECT op, data_version FROM retail_sales_changes ORDER BY change_id"
+            )).all()
+    finally:
+        engine.dispose()
+    
+    assert [tuple(row) for row in ops] == [('R', 0), ('I', 1), ('I', 1)]
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.cache import ResponseCache
+from api.compression import CompressionMiddleware, negotiate_encoding
+
+async def first_version():
+    return 1
+
+def cached_app(version_key=first_version, rows=10):
+    async def sales(request):
+        return JSONResponse({'rows': list(range(rows))})
+    
+    cache = ResponseCache()
+    app = Starlette(routes=[Route('/sales', sales)])
+    app.add_middleware(CompressionMiddleware, cache=cache, version_key=version_key, cacheable_paths=('/sales',))
+    return TestClient(app), cache
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('*;q=0.5, br;q=0', 'gzip'),
+    ('identity', None),
+    ('', None),
+])
+def test_negotiation_honours_q_values(accept, expected):
+    assert negotiate_encoding(accept) == expected
+
+def test_large_responses_are_compressed_once_per_encoding():
+    client, cache = cached_app(rows=2000)
+    
+    first = client.get('/sales', headers={'Accept-Encoding': 'gzip'})
+    second = client.get('/sales', headers={'Accept-Encoding': 'gzip'})
+    
+    assert first.headers['content-encoding'] == second.headers['content-encoding'] == 'gzip'
+    assert second.headers['x-cache'] == 'HIT'
+    assert second.json() == {'rows': list(range(2000))}
+    assert list(cache.get(ResponseCache.make_key(1, '/sales', b'')).encoded) == ['gzip']
+
+def test_small_responses_are_not_compressed():
+    client, cache = cached_app(rows=10)
+    
+    response = client.get('/sales', headers={'Accept-Encoding': 'gzip'})
+    
+    assert 'content-encoding' not in response.headers
+
+def test_responses_are_cached_per_data_version():
+    versions = [1]
+    
+    async def version_key():
+        return versions[0]
+    client, cache = cached_app(version_key)
+    
+    assert client.get('/sales').headers['x-cache'] == 'MISS'
+    assert client.get('/sales').headers['x-cache'] == 'HIT'
+    
+    versions[0] = 2
+    assert client.get('/sales').headers['x-cache'] == 'MISS'
+
+def test_unreadable_data_version_serves_uncached():
+    async def version_key():
+        raise RuntimeError("dataset_summary unavailable")
+    client, cache = cached_app(version_key)
+    
+    response = client.get('/sales')
+    
+    assert response.status_code == 200
+    assert response.json() == {'rows': list(range(10))}
+    assert 'x-cache' not in response.headers
+    assert cache.hits == cache.misses == 0
+
+def test_identical_concurrent_requests_share_one_run():
+    calls = []
+    
+    async def sales(request):
+        calls.append(request.url.query)
+        await asyncio.sleep(0.05)  # still running when the followers arrive
+        return JSONResponse({'rows': list(range(10))})
+    
+    app = Starlette(routes=[Route('/sales', sales)])
+    app.add_middleware(CompressionMiddleware, cache=ResponseCache(), version_key=first_version, cacheable_paths=('/sales',))
+    
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            # Parameter order differs; the normalised cache key is the same
+            return await asyncio.gather(*[
+                client.get('/sales?category=20&state=AUS' if i % 2 else '/sales?state=AUS&category=20')
+                for i in range(6)
+            ])
+    
+    responses = asyncio.run(burst())
+    
+    assert len(calls) == 1
+    assert sorted(r.headers['x-cache'] for r in responses) == ['COALESCED'] * 5 + ['MISS']
+    assert all(r.json() == {'rows': list(range(10))} for r in responses)
+
+def test_coalescing_can_be_turned_off(monkeypatch):
+    calls = []
+    
+    async def sales(request):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return JSONResponse({'rows': []})
+    
+    monkeypatch.setenv('RESPONSE_COALESCING', '0')
+    app = Starlette(routes=[Route('/sales', sales)])
+    app.add_middleware(CompressionMiddleware, cache=ResponseCache(), version_key=first_version, cacheable_paths=('/sales',))
+    
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await asyncio.gather(*[client.get('/sales') for _ in range(3)])
+    
+    responses = asyncio.run(burst())
+    
+    assert len(calls) == 3
+    assert [r.headers['x-cache'] for r in responses] == ['MISS'] * 3
+
+def test_followers_run_their_own_request_when_the_leader_fails():
+    calls = []
+    
+    async def sales(request):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        status = 500 if len(calls) == 1 else 200
+        return JSONResponse({'rows': []}, status_code=status)
+    
+    app = Starlette(routes=[Route('/sales', sales)])
+    app.add_middleware(CompressionMiddleware, cache=ResponseCache(), version_key=first_version, cacheable_paths=('/sales',))
+    
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await asyncio.gather(*[client.get('/sales') for _ in range(3)])
+    
+    statuses = sorted(r.status_code for r in asyncio.run(burst()))
+    
+    assert statuses == [200, 200, 500]
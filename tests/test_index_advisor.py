@@ -0,0 +1,54 @@
+import json
+import os
+
+from sqlalchemy import create_engine, text
+
+from utils.index_advisor import plan_nodes, seq_scans, table_rows
+
+def scan(relation, condition=None):
+    node = {'Node Type': 'Seq Scan', 'Relation Name': relation}
+    if condition:
+        node['Filter'] = condition
+    return node
+
+def test_partition_scans_are_one_finding_for_their_table():
+    sizes = {'facts': 0, 'facts_y1': 6000, 'facts_y2': 6000, 'mapping': 50}
+    roots = {'facts': 'facts', 'facts_y1': 'facts', 'facts_y2': 'facts', 'mapping': 'mapping'}
+    nodes = [scan('facts_y1', '(v > 0)'), scan('facts_y2', '(v > 0)'), scan('mapping'), scan('facts_y1')]
+    
+    assert seq_scans(nodes, sizes, roots) == [('facts', 2, 12000, '(v > 0)')]
+
+def test_scan_of_one_small_partition_is_fine():
+    sizes = {'facts_y1': 6000, 'facts_y2': 6000}
+    roots = {'facts_y1': 'facts', 'facts_y2': 'facts'}
+    
+    assert seq_scans([scan('facts_y2')], sizes, roots) == []
+
+def test_partitioned_table_scan_is_found_in_a_real_plan(fresh_database):
+    engine = create_engine(
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{fresh_database}"
+    )
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE facts (year INTEGER NOT NULL, v INTEGER) PARTITION BY RANGE (year)"))
+            for year in (2022, 2023, 2024):
+                conn.execute(text(
+                    f"CREATE TABLE facts_y{year} PARTITION OF facts FOR VALUES FROM ({year}) TO ({year + 1})"
+                ))
+            conn.execute(text("INSERT INTO facts SELECT 2022 + i % 3, i FROM generate_series(1, 12000) i"))
+            conn.execute(text("ANALYZE facts"))
+        
+        with engine.connect() as conn:
+            sizes, roots = table_rows(conn)
+            
+            def findings(sql):
+                plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+                return seq_scans(list(plan_nodes(plan['Plan'])), sizes, roots)
+            
+            assert roots['facts_y2023'] == 'facts'
+            assert findings("SELECT year, SUM(v) FROM facts GROUP BY 1") == [('facts', 3, 12000, None)]
+            assert findings("SELECT SUM(v) FROM facts WHERE year = 2023") == []
+    finally:
+        engine.dispose()
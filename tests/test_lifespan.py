@@ -0,0 +1,32 @@
+import asyncio
+
+import api.main as main
+
+def test_background_tasks_finish_before_engine_dispose(monkeypatch):
+    events = []
+    
+    async def background(name):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            await asyncio.sleep(0)  # cleanup that needs the loop, e.g. returning a connection
+            events.append(f"{name} stopped")
+            raise
+    
+    class Engine:
+        async def dispose(self):
+            events.append("engine disposed")
+    
+    monkeypatch.setenv('STARTUP_WARMUP', '1')
+    monkeypatch.setattr(main, 'warm_up', lambda *args, **kwargs: background('warm-up'))
+    monkeypatch.setattr(main, 'watch_versions', lambda *args: background('watcher'))
+    monkeypatch.setattr(main, 'engine', Engine())
+    
+    async def serve():
+        async with main.lifespan(main.app):
+            await asyncio.sleep(0)
+    
+    asyncio.run(serve())
+    
+    assert sorted(events[:2]) == ["warm-up stopped", "watcher stopped"]
+    assert events[2:] == ["engine disposed"]
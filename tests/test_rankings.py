@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from load.db_loader import compute_rankings
+
+def monthly_sales(series, start, end, growth=0.01):
+    """Turnover growing `growth` per month for each (category, state) in series"""
+    dates = pd.date_range(start, end, freq='MS')
+    return pd.DataFrame([
+        {'sale_date': day, 'category': category, 'state': state, 'turnover_millions': 100 * (1 + growth) ** i}
+        for category, state in series
+        for i, day in enumerate(dates)
+    ])
+
+def forecast_rows(series, start, months, value):
+    return pd.DataFrame([
+        {'forecast_date': day, 'category': category, 'state': state, 'predicted_turnover': value}
+        for category, state in series
+        for day in pd.date_range(start, periods=months, freq='MS')
+    ])
+
+def forecast_growth(rankings):
+    rows = rankings[rankings['metric'] == 'forecast_growth']
+    return {(row.category, row.state): row.value for row in rows.itertuples()}
+
+def test_forecast_overlapping_actuals_compares_same_months_a_year_earlier():
+    series = [('1', '2'), ('3', '4')]
+    sales = monthly_sales(series, '2022-01-01', '2024-12-01', growth=0)
+    # Forecasts start six months before the last actual: only 2025-01..06 count
+    forecasts = forecast_rows(series, '2024-07-01', 12, 110.0)
+    
+    values = forecast_growth(compute_rankings(sales, forecasts))
+    
+    assert values == {('1', '2'): pytest.approx(10.0), ('3', '4'): pytest.approx(10.0)}
+
+def test_forecast_growth_uses_only_forecast_months():
+    sales = monthly_sales([('1', '2')], '2022-01-01', '2024-12-01', growth=0.01)
+    forecasts = forecast_rows([('1', '2')], '2025-01-01', 3, 200.0)
+    
+    earlier = sales.set_index('sale_date').loc['2024-01-01':'2024-03-01', 'turnover_millions'].sum()
+    values = forecast_growth(compute_rankings(sales, forecasts))
+    
+    assert values[('1', '2')] == pytest.approx(round((600 / earlier - 1) * 100, 4))
+
+def test_series_without_a_year_of_actuals_is_left_out():
+    sales = pd.concat([
+        monthly_sales([('1', '2')], '2022-01-01', '2024-12-01', growth=0),
+        monthly_sales([('3', '4')], '2024-06-01', '2024-12-01', growth=0),
+    ])
+    forecasts = forecast_rows([('1', '2'), ('3', '4')], '2025-01-01', 12, 100.0)
+    
+    values = forecast_growth(compute_rankings(sales, forecasts))
+    
+    assert list(values) == [('1', '2')]
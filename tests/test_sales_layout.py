@@ -0,0 +1,179 @@
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from load.db_loader import (
+    COMPACT_SALES_DDL, DatabaseLoader, append_retail_sales, create_change_log, create_compact_sales,
+    create_partitioned_sales, refresh_dataset_summary
+)
+
+# retail_sales as created before the compact layout
+LEGACY_SALES_DDL = """
+    CREATE TABLE retail_sales (
+        sale_id SERIAL PRIMARY KEY,
+        sale_date DATE NOT NULL,
+        category VARCHAR(200),
+        state VARCHAR(50),
+        turnover_millions DECIMAL(15, 2),
+        month_name VARCHAR(20),
+        year INTEGER,
+        growth_rate_yoy DECIMAL(5, 2),
+        data_source VARCHAR(100) DEFAULT 'ABS_MHSI',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+SERIES = [('20', 'AUS'), ('41', '1')]
+
+def extract(series, start, end, value=100.0):
+    """Transformed extract rows, turnover value + month number"""
+    dates = pd.date_range(start, end, freq='MS')
+    return pd.DataFrame([
+        {
+            'sale_date': day.date(), 'category': category, 'state': state,
+            'turnover_millions': value + i, 'month_name': day.strftime('%B'),
+            'year': day.year, 'growth_rate_yoy': None,
+        }
+        for category, state in series
+        for i, day in enumerate(dates)
+    ])
+
+def keyed(rows):
+    """{(sale_date, category, state): turnover} from rows or a DataFrame"""
+    if isinstance(rows, pd.DataFrame):
+        rows = rows[['sale_date', 'category', 'state', 'turnover_millions']].itertuples(index=False)
+    return {(str(day), category, state): float(value) for day, category, state, value in rows}
+
+def sales_rows(conn):
+    return keyed(conn.execute(text(
+        "SELECT sale_date, category, state, turnover_millions FROM retail_sales"
+    )).all())
+
+def logged_changes(conn, version):
+    return {
+        (op, str(day), category, state, float(value))
+        for op, day, category, state, value in conn.execute(text("""
+            SELECT op, sale_date, category, state, turnover_millions
+            FROM retail_sales_changes WHERE data_version = :version AND op != 'R'
+        """), {'version': version})
+    }
+
+def published_version(conn):
+    return conn.execute(text(
+        "SELECT data_version FROM dataset_summary WHERE dataset = 'retail_sales'"
+    )).scalar()
+
+@pytest.fixture
+def schema(fresh_database, monkeypatch):
+    """Engine on a fresh database with docs/database_schema.sql applied (init_database)"""
+    from utils.init_database import create_database_tables
+    
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert create_database_tables()
+    
+    engine = create_engine(
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{fresh_database}"
+    )
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+def test_compact_migration_keeps_rows_and_change_log(schema):
+    with schema.begin() as conn:
+        conn.execute(text("DROP VIEW retail_sales"))
+        conn.execute(text("DROP TABLE sales_facts"))
+        conn.execute(text(LEGACY_SALES_DDL))
+    create_change_log(schema)
+    
+    sales = extract(SERIES, '2022-01-01', '2023-12-01')
+    append_retail_sales(schema, sales)
+    # An older duplicate of one row: the migration keeps the newest (highest sale_id)
+    duplicate = sales.iloc[[0]].assign(turnover_millions=1.0)
+    append_retail_sales(schema, pd.concat([duplicate, sales.iloc[[0]]]))
+    refresh_dataset_summary(schema, 'retail_sales')
+    
+    with schema.connect() as conn:
+        log_size = conn.execute(text("SELECT COUNT(*) FROM retail_sales_changes")).scalar()
+    
+    create_compact_sales(schema)
+    
+    with schema.connect() as conn:
+        assert conn.execute(text(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('retail_sales')"
+        )).scalar() == 'v'
+        assert conn.execute(text("SELECT COUNT(*) FROM retail_sales_legacy")).scalar() == len(sales) + 2
+        assert conn.execute(text(
+            "SELECT COUNT(*) FROM pg_inherits WHERE inhparent = 'sales_facts'::regclass"
+        )).scalar() == 2
+        assert sales_rows(conn) == keyed(sales)
+        # Moved without logging or resetting the change log
+        assert conn.execute(text("SELECT COUNT(*) FROM retail_sales_changes")).scalar() == log_size
+    
+    # The triggers now log writes to sales_facts
+    append_retail_sales(schema, extract([('20', 'AUS')], '2024-01-01', '2024-01-01', value=500.0))
+    
+    with schema.connect() as conn:
+        assert logged_changes(conn, published_version(conn) + 1) == {('I', '2024-01-01', '20', 'AUS', 500.0)}
+
+def test_partition_migration_and_year_reload_log_the_real_diff(schema):
+    # sales_facts as created by create_compact_sales before partitioning
+    with schema.begin() as conn:
+        conn.execute(text("DROP VIEW retail_sales"))
+        conn.execute(text("DROP TABLE sales_facts"))
+        for statement in COMPACT_SALES_DDL:
+            conn.execute(text(statement.replace("PARTITION BY RANGE (sale_date)", "")))
+    create_change_log(schema)
+    
+    sales = extract(SERIES, '2022-01-01', '2023-12-01')
+    append_retail_sales(schema, sales)
+    refresh_dataset_summary(schema, 'retail_sales')
+    
+    create_partitioned_sales(schema)
+    
+    with schema.connect() as conn:
+        assert conn.execute(text(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('sales_facts')"
+        )).scalar() == 'p'
+        assert sales_rows(conn) == keyed(sales)
+        assert logged_changes(conn, published_version(conn) + 1) == set()
+    
+    # New 2023 extract: one revised value, one withdrawn row, one new series
+    reload = sales[sales['year'] == 2023].copy()
+    revised = (reload['category'] == '20') & (reload['sale_date'] == pd.Timestamp('2023-03-01').date())
+    withdrawn = (reload['category'] == '41') & (reload['sale_date'] == pd.Timestamp('2023-07-01').date())
+    reload.loc[revised, 'turnover_millions'] = 250.0
+    reload = pd.concat([reload[~withdrawn], extract([('42', '2')], '2023-05-01', '2023-05-01', value=7.0)])
+    # Rows of other years in the extract are left alone
+    other_year = extract([('20', 'AUS')], '2022-01-01', '2022-01-01', value=-1.0)
+    
+    assert DatabaseLoader().reload_sales_year(pd.concat([reload, other_year]), 2023)
+    
+    with schema.connect() as conn:
+        version = published_version(conn)
+        assert logged_changes(conn, version) == {
+            ('U', '2023-03-01', '20', 'AUS', 250.0),
+            ('D', '2023-07-01', '41', '1', 118.0),  # logged with its old value
+            ('I', '2023-05-01', '42', '2', 7.0),
+        }
+        assert sales_rows(conn) == keyed(pd.concat([sales[sales['year'] == 2022], reload]))
+        assert set(conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'sales_facts_y2023'"
+        )).scalars()) == {
+            'sales_facts_y2023_pkey', 'sales_facts_y2023_sale_date_idx', 'sales_facts_y2023_state_id_sale_date_idx'
+        }
+    
+    # The triggers still fire for the swapped-in partition
+    with schema.begin() as conn:
+        conn.execute(text("""
+            UPDATE sales_facts SET turnover_millions = 300
+            WHERE sale_date = '2023-03-01'
+            AND category_id = (SELECT category_id FROM category_mapping WHERE category_code = '20')
+        """))
+    
+    with schema.connect() as conn:
+        assert logged_changes(conn, version + 1) == {('U', '2023-03-01', '20', 'AUS', 300.0)}
@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+
+from api import shared_cache
+from api.cache import ResponseCache
+from api.shared_cache import SharedCache
+
+def test_workers_on_both_sides_of_a_rollover_keep_their_entries(tmp_path):
+    cache = SharedCache(str(tmp_path / 'shared.db'))
+    
+    cache.put_response('/sales?', '2', b'{"new": true}', 'application/json')
+    cache.put_response('/sales?', '1', b'{"old": true}', 'application/json')  # worker not yet on v2
+    
+    assert cache.get_response('/sales?', '2') == (b'{"new": true}', 'application/json')
+    assert cache.get_response('/sales?', '1') == (b'{"old": true}', 'application/json')
+
+def test_other_versions_are_dropped_after_the_grace_period(tmp_path, monkeypatch):
+    cache = SharedCache(str(tmp_path / 'shared.db'))
+    cache.put_response('/sales?', '1', b'old', 'application/json')
+    
+    monkeypatch.setattr(shared_cache, 'STALE_GRACE_SECONDS', -1)
+    cache.put_response('/states?', '2', b'new', 'application/json')
+    
+    assert cache.get_response('/sales?', '1') is None
+    assert cache.get_response('/states?', '2') == (b'new', 'application/json')
+
+def test_oldest_responses_are_evicted_over_budget(tmp_path):
+    cache = SharedCache(str(tmp_path / 'shared.db'), max_bytes=250)
+    
+    for i in range(3):
+        cache.put_response(f'/series/{i}?', '1', b'x' * 100, 'application/json')
+    
+    assert cache.get_response('/series/0?', '1') is None
+    assert cache.get_response('/series/2?', '1') is not None
+
+def test_cache_files_keyed_by_path_only_are_recreated(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE responses (
+                key TEXT PRIMARY KEY, version TEXT NOT NULL, content_type TEXT NOT NULL,
+                body BLOB NOT NULL, stored_at REAL NOT NULL
+            )
+        """)
+        conn.execute("INSERT INTO responses VALUES ('/sales?', '1', 'application/json', x'00', 0)")
+    conn.close()
+    
+    cache = SharedCache(path)
+    cache.put_response('/sales?', '1', b'a', 'application/json')
+    cache.put_response('/sales?', '2', b'b', 'application/json')
+    
+    assert cache.get_response('/sales?', '1') == (b'a', 'application/json')
+    assert cache.get_response('/sales?', '2') == (b'b', 'application/json')
+
+def test_responses_stored_by_one_worker_are_found_by_another(tmp_path):
+    shared = SharedCache(str(tmp_path / 'shared.db'))
+    first, second = ResponseCache(shared=shared), ResponseCache(shared=shared)
+    key = ResponseCache.make_key('3', '/sales', b'state=AUS&category=20')
+    
+    async def scenario():
+        await first.put_shared(key, first.put(key, b'{"count": 1}', 'application/json'))
+        return await second.get_shared(ResponseCache.make_key('3', '/sales', b'category=20&state=AUS'))
+    
+    entry = asyncio.run(scenario())
+    
+    assert entry.body == b'{"count": 1}'
+    assert second.get(key) is entry  # kept in the second worker's own tier
+
+def test_blobs_are_versioned(tmp_path):
+    cache = SharedCache(str(tmp_path / 'shared.db'))
+    cache.put_blob('sales_snapshot', '1', b'snapshot')
+    
+    assert cache.get_blob('sales_snapshot', '1') == b'snapshot'
+    assert cache.get_blob('sales_snapshot', '2') is None
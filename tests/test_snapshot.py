@@ -0,0 +1,118 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from starlette.testclient import TestClient
+
+from api import snapshot as snapshot_module
+from api.snapshot import SnapshotStore
+
+def sales_frame(value):
+    return pd.DataFrame({
+        'sale_date': pd.to_datetime(['2024-01-01']), 'category': ['20'], 'state': ['AUS'],
+        'turnover_millions': [value], 'growth_rate_yoy': [None],
+    })
+
+def test_newer_version_does_not_share_an_older_load(monkeypatch):
+    async def scenario():
+        release_old = asyncio.Event()
+        
+        async def read_sql(engine, query, params=None):
+            # The first (version 1) load is slow; version 2 loads immediately
+            if not release_old.is_set() and not calls:
+                calls.append(1)
+                await release_old.wait()
+                return sales_frame(1.0)
+            return sales_frame(2.0)
+        
+        calls = []
+        monkeypatch.setattr(snapshot_module, 'read_sql', read_sql)
+        store = SnapshotStore(enabled=True)
+        
+        old = asyncio.ensure_future(store.get(None, 1))
+        await asyncio.sleep(0)
+        # Sharing the version 1 load would never return: it only finishes afterwards
+        new = await asyncio.wait_for(store.get(None, 2), 5)
+        release_old.set()
+        await old
+        
+        return new, store.snapshot
+    
+    new, current = asyncio.run(scenario())
+    
+    assert new.version == 2
+    assert current.version == 2  # the late version 1 load did not replace it
+
+def test_same_version_callers_share_one_load(monkeypatch):
+    calls = []
+    
+    async def read_sql(engine, query, params=None):
+        calls.append(query)
+        await asyncio.sleep(0)
+        return sales_frame(1.0)
+    
+    async def scenario():
+        store = SnapshotStore(enabled=True)
+        return await asyncio.gather(store.get(None, 1), store.get(None, 1))
+    
+    monkeypatch.setattr(snapshot_module, 'read_sql', read_sql)
+    first, second = asyncio.run(scenario())
+    
+    assert first is second
+    assert len(calls) == 1
+
+SALES_QUERIES = [
+    'category=20&state=AUS&limit=24',
+    'state=AUS&start_date=2015-01-01&end_date=2019-12-01&limit=100000',
+    'category=41&limit=100000',
+    # All series; bounded so the limit never cuts between rows sharing a date
+    'start_date=2005-01-01&limit=100000&fields=sale_date,category_code,state_code,turnover_millions,growth_rate_yoy',
+]
+
+AGGREGATE_QUERIES = [
+    f'group_by={group_by}&metric={metric}{filters}'
+    for group_by in ('year', 'quarter', 'state', 'category')
+    for metric in ('sum', 'avg', 'yoy')
+    for filters in ('', '&state=AUS&start_date=1990-05-01&end_date=2000-02-01')
+]
+
+def sorted_rows(rows, keys):
+    return sorted(rows, key=lambda row: tuple(str(row.get(key)) for key in keys))
+
+def assert_rows_match(database, snapshot):
+    assert len(database) == len(snapshot)
+    for db_row, snap_row in zip(database, snapshot):
+        assert db_row.keys() == snap_row.keys()
+        for key, value in db_row.items():
+            if isinstance(value, float) and snap_row[key] is not None:
+                # yoy is rounded to 2 places (half-up in SQL, half-even in pandas)
+                assert snap_row[key] == pytest.approx(value, rel=1e-9, abs=0.011)
+            else:
+                assert snap_row[key] == value
+
+def test_snapshot_matches_database(db_connection, monkeypatch):
+    import api.main as main
+    
+    monkeypatch.setenv('STARTUP_WARMUP', '0')
+    # Each request must run its query, not come back from the response cache
+    monkeypatch.setattr(main.response_cache, 'get', lambda key: None)
+    
+    def fetch(client, enabled):
+        monkeypatch.setattr(main.sales_snapshot, 'enabled', enabled)
+        sales = [client.get(f'/sales?{query}').json() for query in SALES_QUERIES]
+        aggregates = [client.get(f'/sales/aggregate?{query}').json() for query in AGGREGATE_QUERIES]
+        return sales, aggregates
+    
+    with TestClient(main.app) as client:
+        if client.get('/sales?limit=1').status_code != 200:
+            pytest.skip("no sales data in the test database")
+        db_sales, db_aggregates = fetch(client, False)
+        snap_sales, snap_aggregates = fetch(client, True)
+    
+    # Same rows; only the order of rows sharing a sale_date may differ
+    for database, snapshot in zip(db_sales, snap_sales):
+        keys = ['sale_date', 'category_code', 'state_code']
+        assert_rows_match(sorted_rows(database['sales'], keys), sorted_rows(snapshot['sales'], keys))
+    
+    for database, snapshot in zip(db_aggregates, snap_aggregates):
+        assert_rows_match(database['rows'], snapshot['rows'])